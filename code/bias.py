@@ -88,13 +88,16 @@ def evaluate_bias(data: Any, groundtruth: str = 'US Census', output_data_path: s
         report['gender_distribution'] = gender_rows
         report['gender_weights'] = gender_weights
     # --- Assign Weights ---
-    weights = [1.0] * len(df)
+    # Look up per-row weights with vectorized map against the marginal
+    # dicts instead of Python list comprehensions over every row
+    weights_s = pd.Series(1.0, index=df.index)
     if geo_col and geo_weights:
-        weights = [geo_weights.get(str(val), 1.0) for val in df[geo_col]]
+        weights_s = df[geo_col].astype(str).map(geo_weights).fillna(1.0)
     if gender_col and gender_weights:
         # If both, multiply weights for intersectional balance
-        weights = [w * gender_weights.get(str(g), 1.0) for w, g in zip(weights, df[gender_col])]
-    df['Weights'] = weights
+        weights_s = weights_s * df[gender_col].astype(str).map(gender_weights).fillna(1.0)
+    df['Weights'] = weights_s
+    weights = weights_s.tolist()
     # Save weights as JSON if requested
     if weights_json_path:
         import json
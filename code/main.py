@@ -1,60 +1,465 @@
 import streamlit as st
 import pandas as pd
+import base64
+import functools
 import hashlib
-import random
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
 import numpy as np
-from sklearn.impute import SimpleImputer
 from PII import pii_page
 from auth import is_authenticated, login_page, display_user_info, display_logout_button
 from synthesizer import synthesize_page
 
-# Function to hash data
+# Keep PDF intermediates on tmpfs when available so each render stays in RAM
+# instead of doing a disk round trip per file; None falls back to the OS default
+_TMPDIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+# Memoized PATH probe shared by the PDF renderer and its diagnostics; each
+# shutil.which call walks the entire PATH, so cache the answers per process
+_which = functools.lru_cache(maxsize=32)(shutil.which)
+
+# Canonical Chrome/Chromium install locations checked by the PDF renderer
+_CHROME_PATHS = [
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',  # macOS
+    '/usr/bin/google-chrome',  # Linux
+    '/usr/bin/chromium-browser',  # Linux
+    'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',  # Windows
+    'C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe'  # Windows
+]
+
+@functools.lru_cache(maxsize=4)
+def _logo_b64(path, mtime):
+    """Base64-encode the logo once per (path, mtime); a changed file re-encodes."""
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode('utf-8')
+
+@functools.lru_cache(maxsize=1)
+def _find_chrome():
+    """Locate a Chrome/Chromium binary once per process; the answer never changes."""
+    for path in _CHROME_PATHS:
+        if os.path.exists(path):
+            return path
+    for name in ('google-chrome', 'chromium', 'chrome'):
+        path = _which(name)
+        if path:
+            return path
+    return None
+
+# Long-lived headless Chrome session reused across report renders, so each
+# PDF skips the ~1s browser startup. Requires the optional websocket-client
+# package; callers fall back to a one-shot Chrome spawn when unavailable.
+_chrome_session = None
+
+def _chrome_print_to_pdf(url, pdf_path, timeout=30):
+    """Render url to pdf_path via a persistent headless Chrome over the
+    DevTools protocol. Returns True on success, False if the persistent
+    session cannot be used (caller should fall back to a one-shot spawn)."""
+    global _chrome_session
+    try:
+        import websocket  # websocket-client, optional
+    except ImportError:
+        return False
+    import atexit
+    import json
+    import time
+    import urllib.request
+
+    try:
+        if _chrome_session is None:
+            chrome_path = _find_chrome()
+            if not chrome_path:
+                return False
+            proc = subprocess.Popen([
+                chrome_path,
+                '--headless',
+                '--disable-gpu',
+                '--remote-debugging-port=0'
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            port = None
+            deadline = time.time() + 15
+            while time.time() < deadline:
+                line = proc.stderr.readline()
+                if not line:
+                    break
+                m = re.search(r'DevTools listening on ws://[^:]+:(\d+)/', line)
+                if m:
+                    port = int(m.group(1))
+                    break
+            if port is None:
+                proc.kill()
+                return False
+            atexit.register(proc.kill)
+            _chrome_session = (proc, port)
+
+        proc, port = _chrome_session
+        if proc.poll() is not None:
+            # Chrome died; drop the session so the next render relaunches it
+            _chrome_session = None
+            return False
+
+        # Open a blank tab; navigation is driven over the DevTools socket
+        # below so the load event cannot fire before we subscribe to it
+        req = urllib.request.Request(f'http://127.0.0.1:{port}/json/new', method='PUT')
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            tab = json.loads(resp.read().decode('utf-8'))
+
+        ws = websocket.create_connection(tab['webSocketDebuggerUrl'], timeout=timeout)
+        try:
+            # Subscribe to page events first, then navigate and wait for
+            # the load event before printing
+            ws.send(json.dumps({'id': 1, 'method': 'Page.enable'}))
+            ws.send(json.dumps({'id': 2, 'method': 'Page.navigate', 'params': {'url': url}}))
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                msg = json.loads(ws.recv())
+                if msg.get('method') == 'Page.loadEventFired':
+                    break
+                if msg.get('id') in (1, 2) and 'error' in msg:
+                    return False
+            ws.send(json.dumps({'id': 3, 'method': 'Page.printToPDF', 'params': {
+                'displayHeaderFooter': False,
+                'marginTop': 0.5, 'marginBottom': 0.5,
+                'marginLeft': 0.5, 'marginRight': 0.5
+            }}))
+            while True:
+                msg = json.loads(ws.recv())
+                if msg.get('id') == 3:
+                    if 'error' in msg:
+                        return False
+                    with open(pdf_path, 'wb') as f:
+                        f.write(base64.b64decode(msg['result']['data']))
+                    return True
+        finally:
+            ws.close()
+            try:
+                urllib.request.urlopen(
+                    urllib.request.Request(f'http://127.0.0.1:{port}/json/close/{tab["id"]}'),
+                    timeout=5
+                )
+            except Exception:
+                pass
+    except Exception:
+        return False
+
+# Precompiled bold pattern used by the PDF fallback renderer; compiling once
+# at import time avoids the per-render compile/cache lookup
+def _file_big_enough(path, min_size=1000):
+    """True when path exists and holds more than min_size bytes.
+
+    One stat call instead of the exists()+getsize() pair; a missing
+    file simply raises OSError, which counts as too small.
+    """
+    try:
+        return os.path.getsize(path) > min_size
+    except OSError:
+        return False
+
+# Flags that cut one-shot headless Chrome startup down: skip the zygote
+# and sandbox processes, GPU/raster init and extensions, and cap page
+# "settling" time with a virtual time budget so printing starts sooner
+_CHROME_FAST_FLAGS = [
+    '--disable-gpu-sandbox',
+    '--single-process',
+    '--no-zygote',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-software-rasterizer',
+    '--hide-scrollbars',
+    '--run-all-compositor-stages-before-draw',
+    '--virtual-time-budget=5000',
+]
+
+# Stylesheet for the pandoc-generated report HTML; a module constant injected
+# into the document head instead of a CSS file written and linked per render
+_REPORT_CSS = """
+body {
+    font-family: Helvetica, Arial, sans-serif;
+    font-size: 12pt;
+    line-height: 1.4;
+    margin: 1in;
+}
+h1, h2, h3, h4, h5, h6 {
+    font-family: Helvetica, Arial, sans-serif;
+    font-weight: bold;
+}
+h1 {
+    text-align: center;
+    margin-bottom: 1em;
+}
+table {
+    font-family: Helvetica, Arial, sans-serif;
+    border-collapse: collapse;
+    width: 100%;
+    margin: 1em 0;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: left;
+    font-size: 10pt;
+}
+th {
+    background-color: #f2f2f2;
+    font-weight: bold;
+}
+img {
+    max-width: 150px;
+    height: auto;
+    display: block;
+    margin: 0 auto;
+}
+"""
+
+# Static skeleton for the simple-HTML PDF fallback; built once at import
+# time instead of re-rendering an f-string on every report
+_SIMPLE_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Compliance Report</title>
+    <style>
+        body { font-family: Helvetica, Arial, sans-serif; margin: 1in; font-size: 12pt; line-height: 1.4; }
+        img { max-width: 150px; height: auto; display: block; margin: 0 auto; }
+        table { border-collapse: collapse; width: 100%; font-family: Helvetica, Arial, sans-serif; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; font-size: 10pt; }
+        th { background-color: #f2f2f2; font-weight: bold; }
+        h1, h2, h3, h4, h5, h6 { font-family: Helvetica, Arial, sans-serif; font-weight: bold; }
+        h1 { text-align: center; margin-bottom: 1em; }
+    </style>
+</head>
+<body>
+"""
+
+_SIMPLE_HTML_FOOT = """
+</body>
+</html>
+"""
+
+_RE_BOLD = re.compile(r'\*\*(.*?)\*\*')
+
+# Patterns used by the compliance PDF path, compiled once at import instead
+# of per render; Python's internal regex cache is small and shared
+_RE_CAPTION = re.compile(r'\\caption\{[^}]*\}')
+_RE_LABEL = re.compile(r'\\label\{[^}]*\}')
+_RE_LOGO_MD_ANYPATH = re.compile(r'!\[.*?\]\([^)]*TruifyLogo\.png\)')
+_RE_LOGO_MD_LOCAL = re.compile(r'!\[.*?\]\(TruifyLogo\.png\)')
+_RE_LOGO_IMG_TAG = re.compile(r'<img[^>]*src="[^"]*TruifyLogo\.png"[^>]*>')
+
+# Function to convert report markdown to simple HTML
+def _md_to_html(md):
+    """Convert report markdown to simple HTML in one pass over the lines,
+    instead of six whole-document regex scans."""
+    out = []
+    in_ul = False
+    for line in md.splitlines():
+        if line.startswith('- '):
+            if not in_ul:
+                out.append('<ul>')
+                in_ul = True
+            out.append(f'<li>{line[2:]}</li>')
+            continue
+        if in_ul:
+            out.append('</ul>')
+            in_ul = False
+        if line.startswith('### '):
+            out.append(f'<h3>{line[4:]}</h3>')
+        elif line.startswith('## '):
+            out.append(f'<h2>{line[3:]}</h2>')
+        elif line.startswith('# '):
+            out.append(f'<h1>{line[2:]}</h1>')
+        else:
+            out.append(line)
+    if in_ul:
+        out.append('</ul>')
+    return _RE_BOLD.sub(r'<strong>\1</strong>', '\n'.join(out))
+
+# Optional C-backed markdown renderer (libcmark binding) for the simple-HTML
+# PDF fallback; the pure-Python converter below covers its absence
+try:
+    import cmarkgfm
+except ImportError:
+    cmarkgfm = None
+
+# Optional Numba-compiled fill kernel for numeric columns; falls back to the
+# pandas path when numba is not installed
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, cache=True)
+    def _fill_numeric_kernel(arr, methods):
+        """Fill NaNs in each column of a float64 array in place (0=mean, 1=median)."""
+        for j in prange(arr.shape[1]):
+            col = arr[:, j]
+            mask = np.isnan(col)
+            n = mask.sum()
+            if n == 0 or n == col.shape[0]:
+                continue
+            if methods[j] == 0:
+                fill = np.nanmean(col)
+            else:
+                fill = np.nanmedian(col)
+            for i in range(col.shape[0]):
+                if mask[i]:
+                    col[i] = fill
+except ImportError:
+    _fill_numeric_kernel = None
+
+# Function to hash data; memoized so a value repeated across columns or
+# deidentification runs costs one SHA-256 and then dict lookups
+@functools.lru_cache(maxsize=None)
 def hash_data(value):
     return hashlib.sha256(value.encode()).hexdigest()
 
+# Precompiled matcher for the PII keywords; compiled once at import instead
+# of per call, and the words are plain literals so the scan never backtracks
+_PII_WORDS_RE = re.compile(r'\b(?:name|address|phone|email)\b', re.IGNORECASE)
+
+# Dtype choices for the Import Data column configuration; built once instead
+# of two fresh lists (options + index lookup) per column per rerun
+DTYPE_CHOICES = ('object', 'int64', 'float64', 'datetime64[ns]', 'bool')
+DTYPE_IDX = {d: i for i, d in enumerate(DTYPE_CHOICES)}
+
 # Function to identify personal information columns
 def identify_personal_info_columns(df):
     personal_info_columns = []
     for column in df.columns:
         if df[column].dtype == object:
-            if any(df[column].str.contains(r'\b(?:name|address|phone|email)\b', case=False, na=False)):
+            # The column name is the strongest signal and costs one check
+            if _PII_WORDS_RE.search(str(column)):
+                personal_info_columns.append(column)
+                continue
+            # Otherwise sample the first 50 values with an early exit
+            # rather than regex-scanning every cell in the column
+            sample = df[column].dropna().astype(str).head(50)
+            if any(_PII_WORDS_RE.search(value) for value in sample):
                 personal_info_columns.append(column)
     return personal_info_columns
 
 # Function to deidentify data
 def deidentify_data(df, personal_info_columns):
     for column in personal_info_columns:
-        df[column] = df[column].apply(lambda x: hash_data(str(x)) if pd.notnull(x) else x)
+        s = df[column]
+        # Hash each distinct value once and broadcast with map; PII columns
+        # repeat values heavily, so this replaces a Python call per cell
+        # with one per unique value plus a C-level lookup
+        mapping = {v: hash_data(str(v)) for v in s.dropna().unique()}
+        df[column] = s.map(mapping, na_action='ignore')
     return df
     
 # Function to reduce bias based on selected ground truth data
 def reduce_bias(df, ground_truth_data):
     # Example placeholder function for reducing bias
     # Implement actual bias reduction logic here
-    weights = []
-    for index, row in df.iterrows():
-        weight = random.uniform(0.5, 1.5)  # Placeholder for actual weight calculation
-        weights.append(weight)
-    df['Weights'] = weights
+    # Draw all weights in one vectorized call instead of iterating rows
+    rng = np.random.default_rng()
+    df['Weights'] = rng.uniform(0.5, 1.5, size=len(df))  # Placeholder for actual weight calculation
     return df
 
 # Function to fill missing values
 def fill_missing_values(df, method):
-    if method == "na.roughfix":
-        # Placeholder for actual na.roughfix() implementation
-        imputer = SimpleImputer(strategy="mean")
-    elif method == "mean":
-        imputer = SimpleImputer(strategy="mean")
-    elif method == "mode":
-        imputer = SimpleImputer(strategy="most_frequent")
-    elif method == "median":
-        imputer = SimpleImputer(strategy="median")
-    elif method == "LOCF":
-        df = df.ffill()
+    # Impute with pandas' per-column fillna instead of SimpleImputer, which
+    # bounces the whole frame through a rectangular ndarray and upcasts
+    # mixed dtypes to object/float64 on the way back
+    if method == "LOCF":
+        return df.ffill()
+    if method == "mode":
+        modes = df.mode(dropna=True)
+        if not modes.empty:
+            df = df.fillna(modes.iloc[0])
         return df
-    df = pd.DataFrame(imputer.fit_transform(df), columns=df.columns)
+    # na.roughfix is a placeholder that behaves like mean for now
+    numeric_cols = df.select_dtypes(include=np.number).columns
+    if method == "median":
+        fills = df[numeric_cols].median()
+    else:
+        fills = df[numeric_cols].mean()
+    df[numeric_cols] = df[numeric_cols].fillna(fills)
     return df
 
+# Function to race PDF engine subprocesses
+def _race_pdf_engines(candidates, min_size=1000, timeout=30):
+    """Run candidate PDF engine commands concurrently and return the first that
+    produces a usable PDF. candidates is a list of (name, cmd, out_path) tuples;
+    returns (winning out_path or None, list of error messages)."""
+    import asyncio
+
+    async def _race():
+        errors = []
+
+        async def _run_one(name, cmd, out_path):
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise RuntimeError(f"{name}: not installed")
+            try:
+                await asyncio.wait_for(proc.wait(), timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise RuntimeError(f"{name}: timed out after {timeout}s")
+            except asyncio.CancelledError:
+                # A rival engine won; kill the child instead of letting
+                # it run to completion in the background, and reap it
+                # before the loop closes so the transport isn't orphaned
+                proc.kill()
+                await proc.wait()
+                raise
+            if proc.returncode != 0:
+                raise RuntimeError(f"{name}: exited with code {proc.returncode}")
+            if not _file_big_enough(out_path, min_size):
+                raise RuntimeError(f"{name}: File too small or empty")
+            return out_path
+
+        pending = {asyncio.ensure_future(_run_one(*cand)) for cand in candidates}
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    winner = task.result()
+                except Exception as e:
+                    errors.append(str(e))
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Let the cancellations run so the losers' processes are
+            # killed and their transports reaped inside the loop
+            await asyncio.gather(*pending, return_exceptions=True)
+        return winner, errors
+
+    return asyncio.run(_race())
+
+# Function to parse the missingness report markdown table
+def parse_missingness_table(md):
+    """Parse the markdown missingness report into [Column Name, % Missing, Imputation Method, Data Type, Reason] rows."""
+    rows = [line for line in md.splitlines() if line.startswith('|') and not line.startswith('|---')]
+    if not rows:
+        return []
+    # Feed the whole pipe-delimited block to the C-engine CSV parser instead of
+    # splitting each row in Python; the first and last columns are empty
+    # artifacts of the leading/trailing '|' on each line
+    col_df = pd.read_csv(io.StringIO("\n".join(rows)), sep='|', engine='c', skipinitialspace=True).iloc[:, 1:-1]
+    col_df = col_df.astype(str).apply(lambda s: s.str.strip())
+    return [row for row in col_df.values.tolist() if len(row) == 5]
+
+# Cached CSV parser for Import Data: a given upload is parsed once and every
+# Streamlit rerun reuses the cached frame instead of re-reading the bytes.
+# dtype_items is a sorted tuple of (column, dtype) pairs so it is hashable.
+@st.cache_data(max_entries=4, show_spinner=False)
+def _read_csv_cached(raw, dtype_items=None):
+    dtype = dict(dtype_items) if dtype_items else None
+    return pd.read_csv(io.BytesIO(raw), dtype=dtype)
+
 # Function to display enhanced page headers
 def display_page_header(title, description, icon):
     """Display a beautiful gradient page header with icon and description - COMPACT VERSION"""
@@ -102,6 +507,35 @@ def display_page_header(title, description, icon):
     </style>
     """, unsafe_allow_html=True)
 
+# Function to build a histogram figure from pre-binned counts
+def _histogram_figure(series, col):
+    """Bin the column in numpy and hand Plotly 20 bar heights, instead of
+    px.histogram shipping the entire raw column to the browser to bin."""
+    import plotly.graph_objects as go
+    arr = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+    arr = arr[~np.isnan(arr)]
+    if arr.size:
+        counts, edges = np.histogram(arr, bins=20)
+    else:
+        counts, edges = np.zeros(1), np.array([0.0, 1.0])
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, marker_color='#636EFA'))
+    fig.update_layout(title=f"Histogram of {col}")
+    return fig
+
+# Function to compute a pie-chart distribution for one categorical column
+def _pie_distribution(series):
+    """One value_counts pass per column; the sub-2% tail is collapsed into
+    'Other' with numpy array ops instead of boolean-indexed Series rebuilds."""
+    props = series.value_counts(normalize=True)
+    vals = props.index.to_numpy(dtype=object)
+    p = props.to_numpy()
+    keep = p >= 0.02
+    if not keep.all():
+        vals = np.append(vals[keep], 'Other')
+        p = np.append(p[keep], p[~keep].sum())
+    return vals, p
+
 # Function to display graphs
 def display_graphs(df, numeric_cols, categorical_cols):
     #st.subheader("Variable Visualizations")
@@ -114,7 +548,7 @@ def display_graphs(df, numeric_cols, categorical_cols):
             with col1:
                 col = numeric_cols[i]
                 st.markdown(f"**{col}**")
-                fig = px.histogram(df, x=col, nbins=20, title=f"Histogram of {col}", color_discrete_sequence=['#636EFA'])
+                fig = _histogram_figure(df[col], col)
                 fig.update_layout(bargap=0.1, xaxis_title=col, yaxis_title='Frequency', template='plotly_white')
                 st.plotly_chart(fig, use_container_width=True, key=f"hist_{col}_left")
             
@@ -122,7 +556,7 @@ def display_graphs(df, numeric_cols, categorical_cols):
                 if i + 1 < len(numeric_cols):
                     col = numeric_cols[i + 1]
                     st.markdown(f"**{col}**")
-                    fig = px.histogram(df, x=col, nbins=20, title=f"Histogram of {col}", color_discrete_sequence=['#636EFA'])
+                    fig = _histogram_figure(df[col], col)
                     fig.update_layout(bargap=0.1, xaxis_title=col, yaxis_title='Frequency', template='plotly_white')
                     st.plotly_chart(fig, use_container_width=True, key=f"hist_{col}_right")
     
@@ -134,13 +568,8 @@ def display_graphs(df, numeric_cols, categorical_cols):
             with col1:
                 col = categorical_cols[i]
                 st.markdown(f"**{col}**")
-                value_counts = df[col].value_counts(normalize=True)
-                mask = value_counts < 0.02
-                if mask.any():
-                    other_sum = value_counts[mask].sum()
-                    value_counts = value_counts[~mask]
-                    value_counts['Other'] = other_sum
-                pie_df = pd.DataFrame({col: value_counts.index, 'proportion': value_counts.values})
+                names, props = _pie_distribution(df[col])
+                pie_df = pd.DataFrame({col: names, 'proportion': props})
                 fig = px.pie(pie_df, names=col, values='proportion', title=f"Distribution of {col}", color_discrete_sequence=px.colors.sequential.RdBu)
                 fig.update_traces(textinfo='percent+label')
                 fig.update_layout(template='plotly_white')
@@ -150,13 +579,8 @@ def display_graphs(df, numeric_cols, categorical_cols):
                 if i + 1 < len(categorical_cols):
                     col = categorical_cols[i + 1]
                     st.markdown(f"**{col}**")
-                    value_counts = df[col].value_counts(normalize=True)
-                    mask = value_counts < 0.02
-                    if mask.any():
-                        other_sum = value_counts[mask].sum()
-                        value_counts = value_counts[~mask]
-                        value_counts['Other'] = other_sum
-                    pie_df = pd.DataFrame({col: value_counts.index, 'proportion': value_counts.values})
+                    names, props = _pie_distribution(df[col])
+                    pie_df = pd.DataFrame({col: names, 'proportion': props})
                     fig = px.pie(pie_df, names=col, values='proportion', title=f"Distribution of {col}", color_discrete_sequence=px.colors.sequential.RdBu)
                     fig.update_traces(textinfo='percent+label')
                     fig.update_layout(template='plotly_white')
@@ -665,38 +1089,34 @@ else:
 if 'previous_page' not in st.session_state:
     st.session_state['previous_page'] = None
 
-# Render menu as hyperlinked text with checkboxes
+# Render the menu as one radio widget with the visited marker folded into
+# each label, instead of ten columns+markdown+button triples; a single
+# widget round-trips through the Streamlit protocol per rerun
 
-for item in menu_items:
-    item_name = item["name"]
-    
-    # Determine checkbox status based on whether page has been visited
-    if item_name in st.session_state['visited_pages']:
-        checkbox = "✓"  # Check mark for visited pages
-    else:
-        checkbox = "○"  # Empty circle for unvisited pages
-    
-    # Create menu item with checkbox and clickable text
-    col1, col2 = st.sidebar.columns([1, 10])
-    with col1:
-        if item_name in st.session_state['visited_pages']:
-            # For visited pages: show circle with check mark overlay
-            st.markdown(f"""
-            <div style="position: relative; display: inline-block;">
-                <span style="font-size: 32px; color: #FFFFFF; position: relative; z-index: 1;">○</span>
-                <span style="font-size: 24px; color: #FFFFFF; position: absolute; top: 2px; left: 4px; z-index: 2; font-weight: bold;">✓</span>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            # For unvisited pages: show empty circle
-            st.markdown(f"<span style='font-size: 32px; color: #FFFFFF;'>{checkbox}</span>", unsafe_allow_html=True)
-    with col2:
-        if st.button(item_name, key=f"menu_{item_name.replace(' ', '_')}", use_container_width=True):
-            st.session_state['current_page'] = item_name
-            st.session_state['previous_page'] = item_name
-            # Mark the page as visited immediately when clicked
-            st.session_state['visited_pages'].add(item_name)
-            st.rerun()
+def _menu_label(name):
+    mark = "✓" if name in st.session_state['visited_pages'] else "○"
+    return f"{mark} {name}"
+
+menu_labels = [_menu_label(item["name"]) for item in menu_items]
+
+# Keep the radio in sync when navigation happens programmatically
+# (Previous/Next buttons set current_page without touching the widget)
+st.session_state['menu_radio'] = _menu_label(st.session_state['current_page'])
+
+def _on_menu_select():
+    item_name = st.session_state['menu_radio'][2:]
+    st.session_state['current_page'] = item_name
+    st.session_state['previous_page'] = item_name
+    # Mark the page as visited immediately when clicked
+    st.session_state['visited_pages'].add(item_name)
+
+st.sidebar.radio(
+    "Menu",
+    menu_labels,
+    key='menu_radio',
+    label_visibility='collapsed',
+    on_change=_on_menu_select
+)
 
 # Display logout button at bottom of sidebar
 display_logout_button()
@@ -920,12 +1340,14 @@ if page == "Import Data":
     
     if uploaded_file is not None and not st.session_state['file_uploaded']:
         # Initial import to get default data types
-        df = pd.read_csv(uploaded_file)
+        df = _read_csv_cached(uploaded_file.getvalue())
         
-        # Initialize data type configuration with default types for the new file
+        # Initialize data type configuration with default types for the new
+        # file; one dtype sweep instead of an is_numeric_dtype call per column
+        num_mask = df.dtypes.apply(pd.api.types.is_numeric_dtype)
         st.session_state['data_type_config'] = {}
-        for col in df.columns:
-            if pd.api.types.is_numeric_dtype(df[col]):
+        for col, is_num in zip(df.columns, num_mask.to_numpy()):
+            if is_num:
                 if df[col].dtype == 'int64':
                     st.session_state['data_type_config'][col] = 'int64'
                 else:
@@ -1331,8 +1753,8 @@ if page == "Import Data":
                 current_dtype = st.session_state['data_type_config'].get(col, 'object')
                 new_dtype = st.selectbox(
                     f"Data type for {col}",
-                    ['object', 'int64', 'float64', 'datetime64[ns]', 'bool'],
-                    index=['object', 'int64', 'float64', 'datetime64[ns]', 'bool'].index(current_dtype),
+                    DTYPE_CHOICES,
+                    index=DTYPE_IDX.get(current_dtype, 0),
                     key=f"dtype_{col}"
                 )
                 st.session_state['data_type_config'][col] = new_dtype
@@ -1340,9 +1762,6 @@ if page == "Import Data":
             # Apply data type changes button
             if st.button("Apply Data Type Changes", type="primary"):
                 try:
-                    # Re-import with explicit data types
-                    uploaded_file.seek(0)  # Reset file pointer
-                    
                     # Create dtype dictionary for pandas
                     dtype_dict = {}
                     for col, dtype in st.session_state['data_type_config'].items():
@@ -1352,8 +1771,9 @@ if page == "Import Data":
                         else:
                             dtype_dict[col] = dtype
                     
-                    # Re-import with specified data types
-                    df_new = pd.read_csv(uploaded_file, dtype=dtype_dict)
+                    # Re-import with specified data types (cached per upload +
+                    # dtype combination, so repeated applies are free)
+                    df_new = _read_csv_cached(uploaded_file.getvalue(), tuple(sorted(dtype_dict.items())))
                     
                     # Handle datetime columns separately
                     for col, dtype in st.session_state['data_type_config'].items():
@@ -1441,11 +1861,13 @@ elif page == "Describe Data":
             import pandas as pd
             #st.subheader("Variable Visualizations")
             
-            # Process columns to create graphs
+            # Split columns for graphing with one dtype sweep instead of an
+            # is_numeric_dtype call per column
             numeric_cols = []
             categorical_cols = []
-            for col in df.columns:
-                if pd.api.types.is_numeric_dtype(df[col]):
+            num_mask = df.dtypes.apply(pd.api.types.is_numeric_dtype)
+            for col, is_num in zip(df.columns, num_mask.to_numpy()):
+                if is_num:
                     numeric_cols.append(col)
                 else:
                     categorical_cols.append(col)
@@ -1511,42 +1933,18 @@ elif page == "Reduce Bias":
         ground_truth_data = st.selectbox("Select ground truth data source:", ["US Census", "Other"])
         if st.button("Create Weights"):
             import sys
-            import os
-            import tempfile
-            import subprocess
-            import pandas as pd
-            import json
-            # Save current df to a temporary CSV
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp:
-                df.to_csv(tmp.name, index=False)
-                tmp_path = tmp.name
-            # Prepare output paths
-            bias_report_path = os.path.join(os.path.dirname(tmp_path), "bias_report.md")
-            weights_json_path = os.path.join(os.path.dirname(tmp_path), "weights.json")
-            # Call bias.py as a subprocess, requesting weights as JSON
-            result = subprocess.run([
-                sys.executable, os.path.join("code", "bias.py"), tmp_path, "--groundtruth", ground_truth_data, "--output", bias_report_path, "--weights_json", weights_json_path
-            ], capture_output=True, text=True)
-            # Read the generated bias_report.md
-            if os.path.exists(bias_report_path):
-                with open(bias_report_path, "r") as f:
-                    bias_md = f.read()
-                st.markdown(bias_md)
-            else:
-                st.error("Bias report could not be generated.\n" + result.stderr)
-            # Read weights and preview the weighted dataframe
-            if os.path.exists(weights_json_path):
-                with open(weights_json_path, "r") as f:
-                    weights = json.load(f)
+            sys.path.append("./code")
+            import bias
+            # Call the bias module in-process: no interpreter startup and no
+            # CSV/JSON round trip through the filesystem per click
+            try:
+                result = bias.evaluate_bias(df, groundtruth=ground_truth_data)
+                st.markdown(result['markdown'])
                 weighted_df = df.copy()
-                weighted_df['Weights'] = weights
+                weighted_df['Weights'] = result['weights']
                 st.session_state['preview_weighted_df'] = weighted_df
-            # Clean up temp files
-            os.remove(tmp_path)
-            if os.path.exists(bias_report_path):
-                os.remove(bias_report_path)
-            if os.path.exists(weights_json_path):
-                os.remove(weights_json_path)
+            except Exception as e:
+                st.error(f"Bias report could not be generated.\n{e}")
         # Show preview and keep weights button if available
         if 'preview_weighted_df' in st.session_state:
             st.subheader("Preview Weighted DataFrame")
@@ -1587,8 +1985,12 @@ elif page == "Fill Missingness":
             if st.button("Fill Missingness"):
                 # Always use the original, unstyled dataframe for imputation
                 df = st.session_state['df'].copy()
-                import numpy as np
-                df.replace(r'^\s*$', np.nan, regex=True, inplace=True)
+                # Blank whitespace-only strings with a vectorized strip+compare
+                # on the object columns only, instead of regex-replacing across
+                # every column of the frame
+                for c in df.select_dtypes(include='object').columns:
+                    s = df[c]
+                    df[c] = s.mask(s.str.strip().eq(''))
                 
                 # Use the enhanced missingness module for intelligent imputation
                 try:
@@ -1601,12 +2003,9 @@ elif page == "Fill Missingness":
                     # Use the intelligent imputation function
                     df_imputed = missingness.impute_missing_values(df)
                     
-                    # Calculate filled count
-                    filled_count = 0
-                    for col in df.columns:
-                        before = df[col].isnull().sum()
-                        after = df_imputed[col].isnull().sum()
-                        filled_count += before - after
+                    # Calculate filled count with two whole-frame scans instead
+                    # of a pair of per-column reductions
+                    filled_count = int(df.isna().to_numpy().sum() - df_imputed.isna().to_numpy().sum())
                     
                     # Update session state
                     st.session_state['df'] = df_imputed
@@ -1619,24 +2018,77 @@ elif page == "Fill Missingness":
                     st.error(f"Error during intelligent imputation: {e}")
                     st.info("Falling back to basic imputation methods...")
                     
-                    # Fallback to basic methods
-                    filled_count = 0
-                    for info in col_info:
-                        col, pct_missing, method, dtype, reason = info
-                        if float(pct_missing.replace('%','')) == 0.0:
-                            continue
-                        before = df[col].isnull().sum()
-                        if method == 'mean':
-                            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(df[col].astype(float).mean())
-                        elif method == 'median':
-                            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(df[col].astype(float).median())
-                        elif method == 'mode':
-                            mode_val = df[col].mode(dropna=True)
-                            if not mode_val.empty:
-                                df[col] = df[col].fillna(mode_val[0])
-                        after = df[col].isnull().sum()
-                        filled_count += before - after
-                    
+                    # Fallback to basic methods; drop clean columns once up front
+                    # instead of re-parsing the percentage inside the loop
+                    col_info = [ci for ci in col_info if float(ci[1].replace('%', '')) > 0.0]
+                    target_cols = [ci[0] for ci in col_info]
+                    before_total = int(df[target_cols].isna().to_numpy().sum())
+                    mean_cols = [ci[0] for ci in col_info if ci[2] == 'mean']
+                    median_cols = [ci[0] for ci in col_info if ci[2] == 'median']
+                    mode_cols = [ci[0] for ci in col_info if ci[2] == 'mode']
+
+                    # Optional Polars fast path for large frames: fill_null runs
+                    # multithreaded kernels over Arrow-backed columns
+                    filled_with_polars = False
+                    if len(df) > 100_000:
+                        try:
+                            import polars as pl
+                            pdf = pl.from_pandas(df)
+                            exprs = (
+                                [pl.col(c).fill_null(pl.col(c).mean()) for c in mean_cols]
+                                + [pl.col(c).fill_null(pl.col(c).median()) for c in median_cols]
+                                + [pl.col(c).fill_null(pl.col(c).mode().first()) for c in mode_cols]
+                            )
+                            df = pdf.with_columns(exprs).to_pandas()
+                            filled_with_polars = True
+                        except Exception:
+                            pass  # polars unavailable or incompatible dtypes; use pandas path
+
+                    if not filled_with_polars:
+                        numeric_fill_cols = mean_cols + median_cols
+                        if _fill_numeric_kernel is not None and numeric_fill_cols:
+                            # Numba kernel fills every numeric column in one
+                            # parallel pass over a contiguous float64 buffer
+                            arr = np.column_stack([
+                                pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=np.float64)
+                                for c in numeric_fill_cols
+                            ])
+                            methods = np.array([0] * len(mean_cols) + [1] * len(median_cols), dtype=np.int64)
+                            _fill_numeric_kernel(arr, methods)
+                            for j, c in enumerate(numeric_fill_cols):
+                                df[c] = arr[:, j]
+                        else:
+                            def _fill_numeric_series(series, method):
+                                # One conversion per column, then statistic and
+                                # fill on the same float64 buffer: nanmean/
+                                # nanmedian plus a masked store is two passes
+                                # total instead of pandas' stat + fillna rescans
+                                arr = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+                                stat = np.nanmean(arr) if method == 'mean' else np.nanmedian(arr)
+                                arr[np.isnan(arr)] = stat
+                                return arr
+
+                            method_by_col = [(ci[0], ci[2]) for ci in col_info if ci[2] in ('mean', 'median')]
+                            try:
+                                # Per-column fills are independent, so run them on a
+                                # thread pool; the numeric kernels release the GIL
+                                from joblib import Parallel, delayed
+                                results = Parallel(n_jobs=-1, backend='threading')(
+                                    delayed(_fill_numeric_series)(df[col], method) for col, method in method_by_col
+                                )
+                            except ImportError:
+                                results = [_fill_numeric_series(df[col], method) for col, method in method_by_col]
+                            for (col, _method), filled in zip(method_by_col, results):
+                                df[col] = filled
+                        # Fill all mode columns in one batched call; mode() per column
+                        # sorts the unique values, so compute it once for the group
+                        if mode_cols:
+                            modes = df[mode_cols].mode(dropna=True)
+                            if not modes.empty:
+                                df[mode_cols] = df[mode_cols].fillna(modes.iloc[0])
+                    after_total = int(df[target_cols].isna().to_numpy().sum())
+                    filled_count = before_total - after_total
+
                     st.session_state['df'] = df
                     st.session_state['missingness_filled_count'] = filled_count
                     st.session_state['missingness_evaluated'] = False
@@ -1660,15 +2112,8 @@ elif page == "Fill Missingness":
                 st.session_state['missingness_report_md'] = md
                 
                 # Parse the markdown to extract column info
-                rows = [line for line in md.splitlines() if line.startswith('|') and not line.startswith('|---')]
-                if len(rows) > 0:
-                    rows = rows[1:]
-                col_info = []
-                for row in rows:
-                    parts = [p.strip() for p in row.strip('|').split('|')]
-                    if len(parts) == 5:
-                        col_info.append(parts)
-                
+                col_info = parse_missingness_table(md)
+
                 st.session_state['missingness_col_info'] = col_info
                 st.session_state['missingness_evaluated'] = True
                 st.rerun()
@@ -1677,34 +2122,21 @@ elif page == "Fill Missingness":
                 st.error(f"Error during missingness analysis: {e}")
                 st.info("Falling back to basic missingness analysis...")
                 
-                # Fallback to basic analysis
-                import sys, os, tempfile, subprocess, re, pandas as pd
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp:
-                    df.to_csv(tmp.name, index=False)
-                    tmp_path = tmp.name
-                missingness_report_path = os.path.join(os.path.dirname(tmp_path), "missingness_report.md")
-                result = subprocess.run([
-                    sys.executable, os.path.join("code", "missingness.py"), tmp_path, "--output", missingness_report_path
-                ], capture_output=True, text=True)
-                if os.path.exists(missingness_report_path):
-                    with open(missingness_report_path, "r") as f:
-                        md = f.read()
+                # Fallback to basic analysis, still in-process: re-running
+                # analyze_missingness on a fresh copy avoids spawning a
+                # second interpreter and two CSV round trips
+                try:
+                    import sys
+                    sys.path.append("./code")
+                    import missingness
+                    md = missingness.analyze_missingness(df.copy())
+                except Exception as e2:
+                    st.error(f"Missingness report could not be generated.\n{e2}")
+                else:
                     st.session_state['missingness_report_md'] = md
-                    rows = [line for line in md.splitlines() if line.startswith('|') and not line.startswith('|---')]
-                    if len(rows) > 0:
-                        rows = rows[1:]
-                    col_info = []
-                    for row in rows:
-                        parts = [p.strip() for p in row.strip('|').split('|')]
-                        if len(parts) == 5:
-                            col_info.append(parts)
-                    st.session_state['missingness_col_info'] = col_info
+                    st.session_state['missingness_col_info'] = parse_missingness_table(md)
                     st.session_state['missingness_evaluated'] = True
                     st.rerun()
-                else:
-                    st.error("Missingness report could not be generated.\n" + result.stderr)
-                if os.path.exists(missingness_report_path):
-                    os.remove(missingness_report_path)
     else:
         st.write("Please import data first.")
 
@@ -1765,7 +2197,17 @@ elif page == "Export Data":
         st.write("**Dataset Preview:**")
         st.dataframe(df.head(10))
         filename = st.text_input("Enter filename for download (with .csv extension):", value="exported_data.csv")
-        csv = df.to_csv(index=False).encode('utf-8')
+        # Write the CSV straight to UTF-8 bytes with pyarrow (ships with
+        # Streamlit) instead of building a full Python str and re-encoding;
+        # fall back to pandas if the frame has types Arrow can't take
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+            buf = io.BytesIO()
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+            csv = buf.getvalue()
+        except Exception:
+            csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="Download data as CSV",
             data=csv,
@@ -1837,10 +2279,13 @@ elif page == "Create Compliance Report":
                     import sys
                     import importlib
                     sys.path.append("./code")
-                    
-                    # Force reload the compliance module to get latest changes
-                    if 'compliance' in sys.modules:
+
+                    # Reload the compliance module only when its source changed,
+                    # so repeated report runs skip the re-parse cost
+                    compliance_mtime = os.path.getmtime(os.path.join(os.path.dirname(__file__), "compliance.py"))
+                    if 'compliance' in sys.modules and st.session_state.get('_compliance_mtime') != compliance_mtime:
                         importlib.reload(sys.modules['compliance'])
+                    st.session_state['_compliance_mtime'] = compliance_mtime
                     import compliance
                     
                     df = st.session_state['df']
@@ -1865,10 +2310,6 @@ elif page == "Create Compliance Report":
         
         # Add download button
         try:
-            import tempfile
-            import subprocess
-            import os
-            
             # Create temporary markdown file with LaTeX image conversion
             markdown_content = st.session_state['compliance_report_md']
             
@@ -1876,576 +2317,487 @@ elif page == "Create Compliance Report":
             # The base64 embedding and multiple PDF methods should handle images properly
             
             # Remove any potential figure captions from the markdown
-            import re
             # Remove figure captions that might be added by pandoc
-            markdown_content = re.sub(r'\\caption\{[^}]*\}', '', markdown_content)
-            markdown_content = re.sub(r'\\label\{[^}]*\}', '', markdown_content)
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as tmp_md:
-                tmp_md.write(markdown_content)
-                tmp_md_path = tmp_md.name
-            
-            # Create temporary PDF file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_pdf:
-                tmp_pdf_path = tmp_pdf.name
-            
-            # Skip custom template for now to avoid LaTeX escape issues
-            tmp_template_path = None
-            
-            # Copy logo file to temporary directory for PDF generation
-            import shutil
-            import base64
-            logo_source = os.path.join(os.path.dirname(__file__), "..", "images", "TruifyLogo.png")
-            logo_dest = os.path.join(os.path.dirname(tmp_md_path), "TruifyLogo.png")
+            markdown_content = _RE_CAPTION.sub('', markdown_content)
+            markdown_content = _RE_LABEL.sub('', markdown_content)
             
-            # Initialize base64 variables
-            base64_image = None
-            img_data = None
-            
-            if os.path.exists(logo_source):
-                shutil.copy2(logo_source, logo_dest)
-                # Update the markdown content to use the local path
-                markdown_content = markdown_content.replace(logo_source, "TruifyLogo.png")
-                # Also replace any absolute paths with just the filename, removing alt text
-                markdown_content = re.sub(r'!\[.*?\]\([^)]*TruifyLogo\.png\)', '![](TruifyLogo.png)', markdown_content)
-                
-                # Try to embed image as base64 for better compatibility
-                try:
-                    with open(logo_source, 'rb') as img_file:
-                        img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                        base64_image = f'![](data:image/png;base64,{img_data})'
-                        # Replace any logo image with embedded base64, regardless of alt text
-                        markdown_content = re.sub(r'!\[.*?\]\(TruifyLogo\.png\)', base64_image, markdown_content)
-                except:
-                    pass  # Fall back to file reference if base64 fails
-                
-                # Create a version with embedded base64 for PDF tools
-                if base64_image:
-                    markdown_content_for_pdf = markdown_content  # Keep base64 for PDF too
-                else:
+            # Serve repeated renders of an unchanged report straight from the
+            # session cache instead of re-running the engine pipeline
+            pdf_cache = st.session_state.setdefault('pdf_cache', {})
+            cache_key = hashlib.blake2b(markdown_content.encode('utf-8'), digest_size=16).hexdigest()
+            if cache_key in pdf_cache:
+                st.download_button(
+                    label="Download PDF Report",
+                    data=pdf_cache[cache_key],
+                    file_name="compliance_report.pdf",
+                    mime="application/pdf"
+                )
+            else:
+                with tempfile.TemporaryDirectory(dir=_TMPDIR) as tmp_dir:
+                    # All intermediate files share a single temporary directory and are
+                    # cleaned up automatically when the context exits
+                    tmp_pdf_path = os.path.join(tmp_dir, 'compliance_report.pdf')
+                    html_path = os.path.join(tmp_dir, 'compliance_report.html')
+
+                    # Skip custom template for now to avoid LaTeX escape issues
+                    tmp_template_path = None
+
+                    # Copy logo file to temporary directory for PDF generation
+                    logo_source = os.path.join(os.path.dirname(__file__), "..", "images", "TruifyLogo.png")
+                    logo_dest = os.path.join(tmp_dir, "TruifyLogo.png")
+
+                    # Initialize base64 variables
+                    base64_image = None
+                    img_data = None
+                    logo_img_tag = None
+
+                    if os.path.exists(logo_source):
+                        shutil.copy2(logo_source, logo_dest)
+                        # Update the markdown content to use the local path
+                        markdown_content = markdown_content.replace(logo_source, "TruifyLogo.png")
+                        # Also replace any absolute paths with just the filename, removing alt text
+                        markdown_content = _RE_LOGO_MD_ANYPATH.sub('![](TruifyLogo.png)', markdown_content)
+
+                        # Try to embed image as base64 for better compatibility;
+                        # the encoding is cached across renders keyed by mtime
+                        try:
+                            img_data = _logo_b64(logo_source, os.path.getmtime(logo_source))
+                            # Build the data URI and both markup forms once;
+                            # each copies the ~logo-sized string a single time
+                            data_uri = 'data:image/png;base64,' + img_data
+                            base64_image = f'![]({data_uri})'
+                            logo_img_tag = f'<img src="{data_uri}" alt="Logo" style="max-width: 150px; height: auto; display: block; margin: 0 auto;">'
+                            # Replace any logo image with embedded base64, regardless of alt text
+                            markdown_content = _RE_LOGO_MD_LOCAL.sub(base64_image, markdown_content)
+                        except:
+                            pass  # Fall back to file reference if base64 fails
+
+                    # Version for PDF tools (with file references when base64 is unavailable)
                     markdown_content_for_pdf = markdown_content
-                    # Remove alt text from any remaining logo references
-                    markdown_content_for_pdf = re.sub(r'!\[.*?\]\(TruifyLogo\.png\)', '![](TruifyLogo.png)', markdown_content_for_pdf)
-                
-                # Rewrite the file with updated content
-                with open(tmp_md_path, 'w') as f:
-                    f.write(markdown_content)
-                
-                # Create separate markdown file for PDF generation (with file references)
-                with tempfile.NamedTemporaryFile(mode='w', suffix='_pdf.md', delete=False) as tmp_md_pdf:
-                    tmp_md_pdf.write(markdown_content_for_pdf)
-                    tmp_md_pdf_path = tmp_md_pdf.name
+                    if not base64_image:
+                        # Remove alt text from any remaining logo references
+                        markdown_content_for_pdf = _RE_LOGO_MD_LOCAL.sub('![](TruifyLogo.png)', markdown_content_for_pdf)
+
+                    # Only the PDF-optimized markdown needs to exist on disk; the main
+                    # markdown is piped to pandoc via stdin below
+                    tmp_md_pdf_path = os.path.join(tmp_dir, 'compliance_report_pdf.md')
+                    with open(tmp_md_pdf_path, 'w') as f:
+                        f.write(markdown_content_for_pdf)
             
-            # Convert markdown to HTML first, then to PDF
-            try:
-                # Always generate HTML first for debugging
-                html_path = tmp_md_path.replace('.md', '.html')
-                html_generated = False
-                
-                # Generate HTML
-                try:
-                    # Create CSS file with Helvetica font
-                    css_path = tmp_md_path.replace('.md', '.css')
-                    css_content = """
-body {
-    font-family: Helvetica, Arial, sans-serif;
-    font-size: 12pt;
-    line-height: 1.4;
-    margin: 1in;
-}
-h1, h2, h3, h4, h5, h6 {
-    font-family: Helvetica, Arial, sans-serif;
-    font-weight: bold;
-}
-h1 {
-    text-align: center;
-    margin-bottom: 1em;
-}
-table {
-    font-family: Helvetica, Arial, sans-serif;
-    border-collapse: collapse;
-    width: 100%;
-    margin: 1em 0;
-}
-th, td {
-    border: 1px solid #ddd;
-    padding: 8px;
-    text-align: left;
-    font-size: 10pt;
-}
-th {
-    background-color: #f2f2f2;
-    font-weight: bold;
-}
-img {
-    max-width: 150px;
-    height: auto;
-    display: block;
-    margin: 0 auto;
-}
-"""
-                    with open(css_path, 'w') as f:
-                        f.write(css_content)
-                    
-                    # First generate HTML without embedded resources
-                    subprocess.run([
-                        'pandoc', 
-                        tmp_md_path, 
-                        '-o', html_path,
-                        '--to=html5',
-                        '--standalone',
-                        '--css=' + css_path,
-                        '--metadata=title:Compliance Report'
-                    ], check=True, capture_output=True, timeout=30)
-                    
-                    # Now manually embed the base64 image in the HTML
-                    if base64_image and os.path.exists(html_path):
-                        with open(html_path, 'r', encoding='utf-8') as f:
-                            html_content = f.read()
-                        
-                        # Replace any logo references with the base64 image
-                        html_content = re.sub(r'<img[^>]*src="[^"]*TruifyLogo\.png"[^>]*>', f'<img src="data:image/png;base64,{img_data}" alt="Logo" style="max-width: 150px; height: auto; display: block; margin: 0 auto;">', html_content)
-                        
-                        # Write the updated HTML with embedded base64 image
-                        with open(html_path, 'w', encoding='utf-8') as f:
-                            f.write(html_content)
-                    
-                    if os.path.exists(html_path) and os.path.getsize(html_path) > 1000:
-                        html_generated = True
-                    else:
-                        st.error("HTML generation failed: File too small or empty")
-                except Exception as e:
-                    st.error(f"HTML generation failed: {str(e)}")
-                
-                # Try multiple PDF generation methods
-                pdf_generated = False
-                error_messages = []
-                
-                # Method 1: Try converting HTML to PDF using wkhtmltopdf
-                if html_generated:
+                    # Convert markdown to HTML first, then to PDF
                     try:
-                        result = subprocess.run([
-                            'wkhtmltopdf',
-                            '--enable-local-file-access',
-                            '--image-quality', '100',
-                            '--image-dpi', '300',
-                            '--page-size', 'A4',
-                            '--margin-top', '0.5in',
-                            '--margin-bottom', '0.5in',
-                            '--margin-left', '0.5in',
-                            '--margin-right', '0.5in',
-                            html_path,
-                            tmp_pdf_path
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("wkhtmltopdf: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"wkhtmltopdf: {str(e)}")
-                
-                # Method 2: Try weasyprint (HTML to PDF)
-                if not pdf_generated and html_generated:
-                    try:
-                        subprocess.run([
-                            'weasyprint',
-                            html_path,
-                            tmp_pdf_path
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("weasyprint: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"weasyprint: {str(e)}")
+                        # Always generate HTML first for debugging
+                        html_generated = False
                 
-                # Method 2.5: Try direct markdown to PDF with embedded images
-                if not pdf_generated:
-                    try:
-                        subprocess.run([
-                            'pandoc', 
-                            tmp_md_pdf_path, 
-                            '-o', tmp_pdf_path,
-                            '--pdf-engine=wkhtmltopdf',
-                            '--pdf-engine-opt=--enable-local-file-access',
-                            '--pdf-engine-opt=--image-quality=100',
-                            '--pdf-engine-opt=--enable-javascript',
-                            '--pdf-engine-opt=--javascript-delay=1000'
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("direct markdown to PDF: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"direct markdown to PDF: {str(e)}")
-                
-                # Method 3: Try Prince (HTML to PDF)
-                if not pdf_generated and html_generated:
-                    try:
-                        subprocess.run([
-                            'prince',
-                            html_path,
-                            '-o', tmp_pdf_path
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("Prince: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"Prince: {str(e)}")
-                
-                # Method 4: Try pandoc HTML to PDF conversion with embedded images
-                if not pdf_generated and html_generated:
-                    try:
-                        subprocess.run([
-                            'pandoc', 
-                            html_path, 
-                            '-o', tmp_pdf_path,
-                            '--pdf-engine=wkhtmltopdf',
-                            '--pdf-engine-opt=--enable-local-file-access',
-                            '--pdf-engine-opt=--image-quality=100',
-                            '--pdf-engine-opt=--enable-javascript',
-                            '--pdf-engine-opt=--javascript-delay=1000'
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("pandoc HTML to PDF: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"pandoc HTML to PDF: {str(e)}")
-                
-                # Method 4.5: Try creating HTML with embedded images and convert to PDF
-                if not pdf_generated:
-                    try:
-                        # Create HTML from PDF-optimized markdown with embedded images
-                        html_pdf_path = tmp_md_pdf_path.replace('.md', '.html')
-                        subprocess.run([
-                            'pandoc', 
-                            tmp_md_pdf_path, 
-                            '-o', html_pdf_path,
-                            '--to=html5',
-                            '--standalone',
-                            '--css=' + css_path,
-                            '--metadata=title:Compliance Report'
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        # Manually embed the base64 image in the HTML
-                        if base64_image and os.path.exists(html_pdf_path):
-                            with open(html_pdf_path, 'r', encoding='utf-8') as f:
-                                html_content = f.read()
-                            
-                            # Replace any logo references with the base64 image
-                            html_content = re.sub(r'<img[^>]*src="[^"]*TruifyLogo\.png"[^>]*>', f'<img src="data:image/png;base64,{img_data}" alt="Logo" style="max-width: 150px; height: auto; display: block; margin: 0 auto;">', html_content)
-                            
-                            # Write the updated HTML with embedded base64 image
-                            with open(html_pdf_path, 'w', encoding='utf-8') as f:
+                        # Generate HTML
+                        try:
+                            # Pipe the markdown into pandoc and take the HTML
+                            # back on stdout; the stylesheet and base64 logo
+                            # are injected in memory before the single write,
+                            # so no CSS file and no read-modify-write cycle
+                            proc = subprocess.run([
+                                'pandoc',
+                                '-f', 'markdown',
+                                '--to=html5',
+                                '--standalone',
+                                '--metadata=title:Compliance Report'
+                            ], input=markdown_content, text=True, check=True, capture_output=True, timeout=30)
+                            html_content = proc.stdout.replace(
+                                '</head>', f'<style>{_REPORT_CSS}</style></head>', 1)
+
+                            if base64_image:
+                                # Replace any logo references with the base64 image
+                                html_content = _RE_LOGO_IMG_TAG.sub(logo_img_tag, html_content)
+
+                            with open(html_path, 'w', encoding='utf-8') as f:
                                 f.write(html_content)
-                        
-                        # Convert HTML to PDF
-                        subprocess.run([
-                            'wkhtmltopdf',
-                            '--enable-local-file-access',
-                            '--image-quality', '100',
-                            '--image-dpi', '300',
-                            '--page-size', 'A4',
-                            '--margin-top', '0.5in',
-                            '--margin-bottom', '0.5in',
-                            '--margin-left', '0.5in',
-                            '--margin-right', '0.5in',
-                            '--enable-javascript',
-                            '--javascript-delay', '1000',
-                            html_pdf_path,
-                            tmp_pdf_path
-                        ], check=True, capture_output=True, timeout=30)
-                        
-                        if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                            pdf_generated = True
-                        else:
-                            error_messages.append("HTML with embedded images to PDF: File too small or empty")
-                    except Exception as e:
-                        error_messages.append(f"HTML with embedded images to PDF: {str(e)}")
+                    
+                            if _file_big_enough(html_path):
+                                html_generated = True
+                            else:
+                                st.error("HTML generation failed: File too small or empty")
+                        except Exception as e:
+                            st.error(f"HTML generation failed: {str(e)}")
                 
-                # Method 5: Try using Chrome/Chromium headless with embedded images (if available)
-                if not pdf_generated:
-                    try:
-                        # Try to find Chrome or Chromium
-                        chrome_paths = [
-                            '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',  # macOS
-                            '/usr/bin/google-chrome',  # Linux
-                            '/usr/bin/chromium-browser',  # Linux
-                            'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',  # Windows
-                            'C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe'  # Windows
+                        # Try multiple PDF generation methods
+                        pdf_generated = False
+                        error_messages = []
+                
+                        # Methods 1-4: race every backend whose inputs already exist
+                        # concurrently; the first one to produce a usable PDF wins,
+                        # so wall time is the fastest engine rather than the sum of
+                        # sequential 30s timeouts
+                        out_wk = os.path.join(tmp_dir, 'wkhtmltopdf.pdf')
+                        out_weasy = os.path.join(tmp_dir, 'weasyprint.pdf')
+                        out_prince = os.path.join(tmp_dir, 'prince.pdf')
+                        out_pandoc_md = os.path.join(tmp_dir, 'pandoc_md.pdf')
+                        out_pandoc_html = os.path.join(tmp_dir, 'pandoc_html.pdf')
+                        candidates = [
+                            # Direct markdown to PDF with embedded images
+                            ('direct markdown to PDF', [
+                                'pandoc',
+                                tmp_md_pdf_path,
+                                '-o', out_pandoc_md,
+                                '--pdf-engine=wkhtmltopdf',
+                                '--pdf-engine-opt=--enable-local-file-access',
+                                '--pdf-engine-opt=--image-quality=100',
+                                '--pdf-engine-opt=--enable-javascript',
+                                '--pdf-engine-opt=--javascript-delay=1000'
+                            ], out_pandoc_md),
                         ]
+                        if html_generated:
+                            candidates += [
+                                ('wkhtmltopdf', [
+                                    'wkhtmltopdf',
+                                    '--enable-local-file-access',
+                                    '--image-quality', '100',
+                                    '--image-dpi', '300',
+                                    '--page-size', 'A4',
+                                    '--margin-top', '0.5in',
+                                    '--margin-bottom', '0.5in',
+                                    '--margin-left', '0.5in',
+                                    '--margin-right', '0.5in',
+                                    html_path,
+                                    out_wk
+                                ], out_wk),
+                                ('weasyprint', ['weasyprint', html_path, out_weasy], out_weasy),
+                                ('prince', ['prince', html_path, '-o', out_prince], out_prince),
+                                # pandoc HTML to PDF conversion with embedded images
+                                ('pandoc HTML to PDF', [
+                                    'pandoc',
+                                    html_path,
+                                    '-o', out_pandoc_html,
+                                    '--pdf-engine=wkhtmltopdf',
+                                    '--pdf-engine-opt=--enable-local-file-access',
+                                    '--pdf-engine-opt=--image-quality=100',
+                                    '--pdf-engine-opt=--enable-javascript',
+                                    '--pdf-engine-opt=--javascript-delay=1000'
+                                ], out_pandoc_html),
+                            ]
+                        # Drop candidates whose binaries aren't on PATH before
+                        # racing, so missing engines cost a memoized lookup
+                        # instead of a failed process spawn
+                        available = []
+                        for name, cmd, out_path in candidates:
+                            binary = _which(cmd[0])
+                            if binary is None:
+                                error_messages.append(f"{name}: not installed")
+                            elif '--pdf-engine=wkhtmltopdf' in cmd and _which('wkhtmltopdf') is None:
+                                error_messages.append(f"{name}: wkhtmltopdf not installed")
+                            else:
+                                # Substitute the resolved absolute path so exec
+                                # skips its own PATH walk
+                                available.append((name, [binary] + cmd[1:], out_path))
+                        candidates = available
+                        # Dispatch straight to the engine that won last time and
+                        # only fall back to the full race when it fails, so repeat
+                        # renders spawn one process instead of one per engine
+                        last_engine = st.session_state.get('pdf_engine')
+                        preferred = [c for c in candidates if c[0] == last_engine]
+                        rest = [c for c in candidates if c[0] != last_engine]
+                        winner, race_errors = None, []
+                        try:
+                            if preferred:
+                                winner, race_errors = _race_pdf_engines(preferred)
+                            if not winner:
+                                prior_errors = race_errors
+                                winner, race_errors = _race_pdf_engines(rest)
+                                race_errors = prior_errors + race_errors
+                        except Exception as e:
+                            winner, race_errors = None, [f"PDF engine race: {str(e)}"]
+                        error_messages.extend(race_errors)
+                        if winner:
+                            for name, cmd, out_path in candidates:
+                                if out_path == winner:
+                                    st.session_state['pdf_engine'] = name
+                                    break
+                            shutil.move(winner, tmp_pdf_path)
+                            pdf_generated = True
+
+                        # Method 4.5: Try creating HTML with embedded images and convert to PDF
+                        if not pdf_generated:
+                            try:
+                                # Create HTML from PDF-optimized markdown with embedded images
+                                html_pdf_path = tmp_md_pdf_path.replace('.md', '.html')
+                                proc = subprocess.run([
+                                    'pandoc',
+                                    tmp_md_pdf_path,
+                                    '--to=html5',
+                                    '--standalone',
+                                    '--metadata=title:Compliance Report'
+                                ], check=True, capture_output=True, text=True, timeout=10)
+                                html_content = proc.stdout.replace(
+                                    '</head>', f'<style>{_REPORT_CSS}</style></head>', 1)
+
+                                # Manually embed the base64 image in the HTML
+                                if base64_image:
+                                    # Replace any logo references with the base64 image
+                                    html_content = _RE_LOGO_IMG_TAG.sub(logo_img_tag, html_content)
+
+                                with open(html_pdf_path, 'w', encoding='utf-8') as f:
+                                    f.write(html_content)
                         
-                        chrome_path = None
-                        for path in chrome_paths:
-                            if os.path.exists(path):
-                                chrome_path = path
-                                break
-                        
-                        if chrome_path:
-                            # Use the HTML file with embedded images if available, otherwise use the PDF-optimized HTML
-                            chrome_html_path = html_path if html_generated else html_pdf_path if 'html_pdf_path' in locals() and os.path.exists(html_pdf_path) else None
-                            
-                            if chrome_html_path and os.path.exists(chrome_html_path):
+                                # Convert HTML to PDF
                                 subprocess.run([
-                                    chrome_path,
-                                    '--headless',
-                                    '--disable-gpu',
-                                    '--print-to-pdf=' + tmp_pdf_path,
-                                    '--print-to-pdf-no-header',
-                                    '--print-to-pdf-no-footer',
-                                    '--print-to-pdf-margin-top=0.5in',
-                                    '--print-to-pdf-margin-bottom=0.5in',
-                                    '--print-to-pdf-margin-left=0.5in',
-                                    '--print-to-pdf-margin-right=0.5in',
-                                    'file://' + os.path.abspath(chrome_html_path)
-                                ], check=True, capture_output=True, timeout=30)
-                                
-                                if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
+                                    'wkhtmltopdf',
+                                    '--enable-local-file-access',
+                                    '--image-quality', '100',
+                                    '--image-dpi', '300',
+                                    '--page-size', 'A4',
+                                    '--margin-top', '0.5in',
+                                    '--margin-bottom', '0.5in',
+                                    '--margin-left', '0.5in',
+                                    '--margin-right', '0.5in',
+                                    '--enable-javascript',
+                                    '--javascript-delay', '1000',
+                                    html_pdf_path,
+                                    tmp_pdf_path
+                                ], check=True, capture_output=True, timeout=10)
+                        
+                                if _file_big_enough(tmp_pdf_path):
                                     pdf_generated = True
                                 else:
-                                    error_messages.append("Chrome headless: File too small or empty")
-                            else:
-                                error_messages.append("Chrome headless: No suitable HTML file found")
-                        else:
-                            error_messages.append("Chrome headless: Chrome/Chromium not found")
-                    except Exception as e:
-                        error_messages.append(f"Chrome headless: {str(e)}")
+                                    error_messages.append("HTML with embedded images to PDF: File too small or empty")
+                            except Exception as e:
+                                error_messages.append(f"HTML with embedded images to PDF: {str(e)}")
                 
-                # Method 6: Try creating a simple HTML file with embedded logo and Chrome headless
-                if not pdf_generated:
-                    try:
-                        # Create a simple HTML file with embedded logo
-                        simple_html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Compliance Report</title>
-    <style>
-        body {{ font-family: Helvetica, Arial, sans-serif; margin: 1in; font-size: 12pt; line-height: 1.4; }}
-        img {{ max-width: 150px; height: auto; display: block; margin: 0 auto; }}
-        table {{ border-collapse: collapse; width: 100%; font-family: Helvetica, Arial, sans-serif; }}
-        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; font-size: 10pt; }}
-        th {{ background-color: #f2f2f2; font-weight: bold; }}
-        h1, h2, h3, h4, h5, h6 {{ font-family: Helvetica, Arial, sans-serif; font-weight: bold; }}
-        h1 {{ text-align: center; margin-bottom: 1em; }}
-    </style>
-</head>
-<body>
-"""
-                        
-                        # Add logo if available
-                        if base64_image:
-                            simple_html_content += f'<img src="data:image/png;base64,{img_data}" alt="Logo" style="max-width: 150px; height: auto; display: block; margin: 0 auto;"><br><br>\n'
-                        
-                        # Convert markdown content to simple HTML
-                        import re
-                        # Remove markdown formatting and convert to simple HTML
-                        html_content = markdown_content
-                        
-                        # Convert headers
-                        html_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-                        html_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
-                        html_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-                        
-                        # Convert bold
-                        html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
-                        
-                        # Convert lists
-                        html_content = re.sub(r'^- (.*?)$', r'<li>\1</li>', html_content, flags=re.MULTILINE)
-                        html_content = re.sub(r'((?:<li>.*?</li>\n?)+)', r'<ul>\1</ul>', html_content, flags=re.DOTALL)
-                        
-                        # Convert line breaks
-                        html_content = html_content.replace('\n\n', '</p><p>')
-                        html_content = '<p>' + html_content + '</p>'
-                        
-                        simple_html_content += html_content + """
-</body>
-</html>
-"""
-                        
-                        # Write simple HTML file
-                        simple_html_path = tmp_md_path.replace('.md', '_simple.html')
-                        with open(simple_html_path, 'w', encoding='utf-8') as f:
-                            f.write(simple_html_content)
-                        
-                        # Try to find Chrome or Chromium
-                        chrome_paths = [
-                            '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',  # macOS
-                            '/usr/bin/google-chrome',  # Linux
-                            '/usr/bin/chromium-browser',  # Linux
-                            'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',  # Windows
-                            'C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe'  # Windows
-                        ]
-                        
-                        chrome_path = None
-                        for path in chrome_paths:
-                            if os.path.exists(path):
-                                chrome_path = path
-                                break
+                        # Method 5: Try using Chrome/Chromium headless with embedded images (if available)
+                        if not pdf_generated:
+                            try:
+                                # Use the cached module-level Chrome lookup
+                                chrome_path = _find_chrome()
                         
-                        if chrome_path and os.path.exists(simple_html_path):
-                            subprocess.run([
-                                chrome_path,
-                                '--headless',
-                                '--disable-gpu',
-                                '--print-to-pdf=' + tmp_pdf_path,
-                                '--print-to-pdf-no-header',
-                                '--print-to-pdf-no-footer',
-                                '--print-to-pdf-margin-top=0.5in',
-                                '--print-to-pdf-margin-bottom=0.5in',
-                                '--print-to-pdf-margin-left=0.5in',
-                                '--print-to-pdf-margin-right=0.5in',
-                                'file://' + os.path.abspath(simple_html_path)
-                            ], check=True, capture_output=True, timeout=30)
+                                if chrome_path:
+                                    # Use the HTML file with embedded images if available, otherwise use the PDF-optimized HTML
+                                    chrome_html_path = html_path if html_generated else html_pdf_path if 'html_pdf_path' in locals() and os.path.exists(html_pdf_path) else None
                             
-                            if os.path.exists(tmp_pdf_path) and os.path.getsize(tmp_pdf_path) > 1000:
-                                pdf_generated = True
-                            else:
-                                error_messages.append("Simple HTML to PDF: File too small or empty")
-                        else:
-                            error_messages.append("Simple HTML to PDF: Chrome not found or HTML not created")
-                    except Exception as e:
-                        error_messages.append(f"Simple HTML to PDF: {str(e)}")
+                                    if chrome_html_path and os.path.exists(chrome_html_path):
+                                        # Prefer the persistent Chrome session; fall
+                                        # back to a one-shot spawn when unavailable
+                                        if not _chrome_print_to_pdf('file://' + os.path.abspath(chrome_html_path), tmp_pdf_path):
+                                            subprocess.run([
+                                                chrome_path,
+                                                '--headless',
+                                            ] + _CHROME_FAST_FLAGS + [
+                                                '--print-to-pdf=' + tmp_pdf_path,
+                                                '--print-to-pdf-no-header',
+                                                '--print-to-pdf-no-footer',
+                                                '--print-to-pdf-margin-top=0.5in',
+                                                '--print-to-pdf-margin-bottom=0.5in',
+                                                '--print-to-pdf-margin-left=0.5in',
+                                                '--print-to-pdf-margin-right=0.5in',
+                                                'file://' + os.path.abspath(chrome_html_path)
+                                            ], check=True, stdout=subprocess.DEVNULL,
+                                                stderr=subprocess.DEVNULL, timeout=10)
+
+                                        if _file_big_enough(tmp_pdf_path):
+                                            pdf_generated = True
+                                        else:
+                                            error_messages.append("Chrome headless: File too small or empty")
+                                    else:
+                                        error_messages.append("Chrome headless: No suitable HTML file found")
+                                else:
+                                    error_messages.append("Chrome headless: Chrome/Chromium not found")
+                            except Exception as e:
+                                error_messages.append(f"Chrome headless: {str(e)}")
                 
-                if not pdf_generated:
-                    # Show diagnostic information
-                    st.error("**Error generating PDF: All PDF generation methods failed**")
-                    st.write("**Error details:**")
-                    for error in error_messages:
-                        st.write(f"- {error}")
-                    
-                    # Check what tools are available
-                    import shutil
-                    tools_available = {
-                        'pandoc': shutil.which('pandoc') is not None,
-                        'wkhtmltopdf': shutil.which('wkhtmltopdf') is not None,
-                        'weasyprint': shutil.which('weasyprint') is not None,
-                        'prince': shutil.which('prince') is not None
-                    }
+                        # Method 6: Try creating a simple HTML file with embedded logo and Chrome headless
+                        if not pdf_generated:
+                            try:
+                                # Create a simple HTML document with embedded logo,
+                                # accumulating pieces in a list and joining once
+                                # instead of growing one string with +=
+                                parts = [_SIMPLE_HTML_HEAD]
+
+                                # Add logo if available
+                                if base64_image:
+                                    parts.append(logo_img_tag + '<br><br>\n')
+
+                                if cmarkgfm is not None:
+                                    # C tokenizer/renderer; handles paragraphs and
+                                    # lists itself, so no wrapping pass is needed
+                                    html_content = cmarkgfm.markdown_to_html(markdown_content)
+                                else:
+                                    # Convert markdown content to simple HTML in a
+                                    # single pass over the lines
+                                    html_content = _md_to_html(markdown_content)
+
+                                    # Wrap paragraphs by splitting on blank lines; blocks
+                                    # that already start with a block-level tag are left
+                                    # alone so headers and lists don't end up inside <p>
+                                    blocks = html_content.split('\n\n')
+                                    wrapped = [
+                                        b if b.lstrip().startswith(('<h', '<ul', '<li', '<p')) else f'<p>{b}</p>'
+                                        for b in blocks if b.strip()
+                                    ]
+                                    html_content = '\n'.join(wrapped)
+
+                                parts.append(html_content)
+                                parts.append(_SIMPLE_HTML_FOOT)
+                                simple_html_content = ''.join(parts)
+
+                                # Hand the HTML to Chrome as a data: URL so no
+                                # intermediate file needs to be written
+                                html_b64 = base64.b64encode(simple_html_content.encode('utf-8')).decode('ascii')
+                                simple_html_url = 'data:text/html;base64,' + html_b64
+
+                                # Use the cached module-level Chrome lookup
+                                chrome_path = _find_chrome()
+
+                                if chrome_path:
+                                    # Prefer the persistent Chrome session; fall
+                                    # back to a one-shot spawn when unavailable
+                                    if not _chrome_print_to_pdf(simple_html_url, tmp_pdf_path):
+                                        # A spawned Chrome receives the URL as one
+                                        # argv entry, and Linux caps a single
+                                        # argument at ~128 KiB (MAX_ARG_STRLEN),
+                                        # so larger reports go through a temp file
+                                        if len(html_b64) > 100 * 1024:
+                                            simple_html_path = os.path.join(tmp_dir, 'compliance_report_simple.html')
+                                            with open(simple_html_path, 'w', encoding='utf-8') as f:
+                                                f.write(simple_html_content)
+                                            simple_html_url = 'file://' + os.path.abspath(simple_html_path)
+                                        subprocess.run([
+                                            chrome_path,
+                                            '--headless',
+                                        ] + _CHROME_FAST_FLAGS + [
+                                            '--print-to-pdf=' + tmp_pdf_path,
+                                            '--print-to-pdf-no-header',
+                                            '--print-to-pdf-no-footer',
+                                            '--print-to-pdf-margin-top=0.5in',
+                                            '--print-to-pdf-margin-bottom=0.5in',
+                                            '--print-to-pdf-margin-left=0.5in',
+                                            '--print-to-pdf-margin-right=0.5in',
+                                            simple_html_url
+                                        ], check=True, stdout=subprocess.DEVNULL,
+                                            stderr=subprocess.DEVNULL, timeout=10)
+
+                                    if _file_big_enough(tmp_pdf_path):
+                                        pdf_generated = True
+                                    else:
+                                        error_messages.append("Simple HTML to PDF: File too small or empty")
+                                else:
+                                    error_messages.append("Simple HTML to PDF: Chrome not found")
+                            except Exception as e:
+                                error_messages.append(f"Simple HTML to PDF: {str(e)}")
+                
+                        if not pdf_generated:
+                            # Show diagnostic information
+                            st.error("**Error generating PDF: All PDF generation methods failed**")
+                            st.write("**Error details:**")
+                            for error in error_messages:
+                                st.write(f"- {error}")
                     
-                    st.write("**Available tools:**")
-                    for tool, available in tools_available.items():
-                        status = "✅ Available" if available else "❌ Not found"
-                        st.write(f"- {tool}: {status}")
+                            # Check what tools are available (memoized PATH probes)
+                            tools_available = {
+                                'pandoc': _which('pandoc') is not None,
+                                'wkhtmltopdf': _which('wkhtmltopdf') is not None,
+                                'weasyprint': _which('weasyprint') is not None,
+                                'prince': _which('prince') is not None
+                            }
                     
-                    # Don't raise exception, just show error
-                    pdf_generated = False
-                
-                # Create download button for PDF only
-                if pdf_generated:
-                    # Read the generated PDF file
-                    with open(tmp_pdf_path, 'rb') as pdf_file:
-                        pdf_data = pdf_file.read()
+                            st.write("**Available tools:**")
+                            for tool, available in tools_available.items():
+                                status = "✅ Available" if available else "❌ Not found"
+                                st.write(f"- {tool}: {status}")
                     
-                    # Create download button for PDF
-                    st.download_button(
-                        label="Download PDF Report",
-                        data=pdf_data,
-                        file_name="compliance_report.pdf",
-                        mime="application/pdf"
-                    )
+                            # Don't raise exception, just show error
+                            pdf_generated = False
                 
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # Check what's available and provide specific guidance
-                import shutil
+                        # Create download button for PDF only
+                        if pdf_generated:
+                            # Read the generated PDF through a 1 MB buffer so the
+                            # transfer is one large read instead of many small ones
+                            with open(tmp_pdf_path, 'rb', buffering=1 << 20) as pdf_file:
+                                pdf_data = pdf_file.read()
+
+                            # Cache the bytes so re-rendering the same report
+                            # becomes a dict lookup; evict oldest past 8 entries
+                            pdf_cache[cache_key] = pdf_data
+                            while len(pdf_cache) > 8:
+                                pdf_cache.pop(next(iter(pdf_cache)))
+
+                            # Create download button for PDF
+                            st.download_button(
+                                label="Download PDF Report",
+                                data=pdf_data,
+                                file_name="compliance_report.pdf",
+                                mime="application/pdf"
+                            )
                 
-                pandoc_available = shutil.which('pandoc') is not None
-                pdflatex_available = shutil.which('pdflatex') is not None
+                    except (subprocess.CalledProcessError, FileNotFoundError):
+                        # Check what's available and provide specific guidance
+                        pandoc_available = _which('pandoc') is not None
+                        pdflatex_available = _which('pdflatex') is not None
                 
-                if pandoc_available and not pdflatex_available:
-                    st.warning("""
-                    **Pandoc is installed but pdflatex is not found in PATH.**
+                        if pandoc_available and not pdflatex_available:
+                            st.warning("""
+                            **Pandoc is installed but pdflatex is not found in PATH.**
                     
-                    On macOS with MacTeX, you may need to add LaTeX to your PATH:
-                    ```bash
-                    export PATH=$PATH:/Library/TeX/texbin
-                    ```
+                            On macOS with MacTeX, you may need to add LaTeX to your PATH:
+                            ```bash
+                            export PATH=$PATH:/Library/TeX/texbin
+                            ```
                     
-                    Or restart your terminal after installing MacTeX.
+                            Or restart your terminal after installing MacTeX.
                     
-                    Alternatively, try installing BasicTeX instead:
-                    ```bash
-                    brew install --cask basictex
-                    ```
-                    """)
-                elif not pandoc_available:
-                    st.warning("""
-                    **Pandoc is not installed.**
+                            Alternatively, try installing BasicTeX instead:
+                            ```bash
+                            brew install --cask basictex
+                            ```
+                            """)
+                        elif not pandoc_available:
+                            st.warning("""
+                            **Pandoc is not installed.**
                     
-                    To install on macOS:
-                    ```bash
-                    brew install pandoc
-                    brew install --cask mactex
-                    ```
+                            To install on macOS:
+                            ```bash
+                            brew install pandoc
+                            brew install --cask mactex
+                            ```
                     
-                    To install on Ubuntu/Debian:
-                    ```bash
-                    sudo apt-get install pandoc texlive-latex-base texlive-fonts-recommended texlive-extra-utils texlive-latex-extra
-                    ```
+                            To install on Ubuntu/Debian:
+                            ```bash
+                            sudo apt-get install pandoc texlive-latex-base texlive-fonts-recommended texlive-extra-utils texlive-latex-extra
+                            ```
                     
-                    To install on Windows:
-                    1. Download Pandoc from https://pandoc.org/installing.html
-                    2. Download MiKTeX from https://miktex.org/download
-                    """)
-                else:
-                    st.warning("""
-                    **PDF generation failed despite having required tools.**
+                            To install on Windows:
+                            1. Download Pandoc from https://pandoc.org/installing.html
+                            2. Download MiKTeX from https://miktex.org/download
+                            """)
+                        else:
+                            st.warning("""
+                            **PDF generation failed despite having required tools.**
                     
-                    This might be due to:
-                    - LaTeX packages not installed
-                    - Permission issues
-                    - Temporary system issues
+                            This might be due to:
+                            - LaTeX packages not installed
+                            - Permission issues
+                            - Temporary system issues
                     
-                    Try restarting your terminal or the application.
-                    """)
-                
-                # Alternative: provide markdown download
-                st.download_button(
-                    label="Download Report (Markdown)",
-                    data=st.session_state['compliance_report_md'],
-                    file_name="compliance_report.md",
-                    mime="text/markdown"
-                )
+                            Try restarting your terminal or the application.
+                            """)
                 
-                # Also provide plain text download as alternative
-                st.download_button(
-                    label="Download Report (Plain Text)",
-                    data=st.session_state['compliance_report_md'],
-                    file_name="compliance_report.txt",
-                    mime='text/plain'
-                )
+                        # Encode the report once; both fallback buttons hand
+                        # Streamlit the same bytes object instead of having it
+                        # re-encode the markdown per button on every rerun
+                        md_bytes = st.session_state['compliance_report_md'].encode('utf-8')
+
+                        # Alternative: provide markdown download
+                        st.download_button(
+                            label="Download Report (Markdown)",
+                            data=md_bytes,
+                            file_name="compliance_report.md",
+                            mime="text/markdown"
+                        )
+
+                        # Also provide plain text download as alternative
+                        st.download_button(
+                            label="Download Report (Plain Text)",
+                            data=md_bytes,
+                            file_name="compliance_report.txt",
+                            mime='text/plain'
+                        )
             
-            # Clean up temporary files
-            try:
-                os.remove(tmp_md_path)
-                if 'tmp_md_pdf_path' in locals() and os.path.exists(tmp_md_pdf_path):
-                    os.remove(tmp_md_pdf_path)
-                if os.path.exists(tmp_pdf_path):
-                    os.remove(tmp_pdf_path)
-                if html_generated and os.path.exists(html_path):
-                    os.remove(html_path)
-                if 'html_pdf_path' in locals() and os.path.exists(html_pdf_path):
-                    os.remove(html_pdf_path)
-                if 'simple_html_path' in locals() and os.path.exists(simple_html_path):
-                    os.remove(simple_html_path)
-                if tmp_template_path and os.path.exists(tmp_template_path):
-                    os.remove(tmp_template_path)
-                if os.path.exists(logo_dest):
-                    os.remove(logo_dest)
-                # Clean up CSS file if it exists
-                css_path = tmp_md_path.replace('.md', '.css')
-                if os.path.exists(css_path):
-                    os.remove(css_path)
-            except:
-                pass
                 
         except Exception as e:
             st.error(f"Error generating PDF: {e}")
@@ -5,70 +5,124 @@ This script analyzes each column of a pandas DataFrame (or CSV file) and generat
 """
 
 import pandas as pd
+import numpy as np
+import functools
+import pathlib
 import sys
 import os
 import re
 
-def infer_gender_from_name(name: str) -> str:
-    """
-    Infer gender from a first name using common name patterns.
-    Returns 'M', 'F', or 'Other' based on the name.
+# Name suffixes that usually signal a gendered first name, compiled once;
+# longest alternatives first so the regex engine commits correctly
+_FEM_SUFFIX_RE = re.compile(r'(?:ia|ina|ella|ette|ine|ana|ena|a)$')
+_MALE_SUFFIX_RE = re.compile(r'(?:us|er|or|an|en|in|on|o)$')
+
+# Common male names (high confidence)
+_MALE_NAMES = frozenset({
+    'james', 'robert', 'john', 'michael', 'david', 'william', 'richard', 'joseph', 'thomas', 'christopher',
+    'charles', 'daniel', 'matthew', 'anthony', 'mark', 'donald', 'steven', 'paul', 'andrew', 'joshua',
+    'kenneth', 'kevin', 'brian', 'george', 'timothy', 'ronald', 'jason', 'edward', 'jeffrey', 'ryan',
+    'jacob', 'gary', 'nicholas', 'eric', 'jonathan', 'stephen', 'larry', 'justin', 'scott', 'brandon',
+    'benjamin', 'frank', 'gregory', 'raymond', 'samuel', 'patrick', 'alexander', 'jack', 'dennis', 'jerry',
+    'mike', 'joe', 'jim', 'bob', 'tom', 'dave', 'chris', 'steve', 'tony', 'jimmy', 'bobby', 'tommy'
+})
+
+# Common female names (high confidence)
+_FEMALE_NAMES = frozenset({
+    'mary', 'patricia', 'jennifer', 'linda', 'elizabeth', 'barbara', 'susan', 'jessica', 'sarah', 'karen',
+    'nancy', 'lisa', 'betty', 'helen', 'sandra', 'donna', 'carol', 'ruth', 'sharon', 'michelle',
+    'laura', 'emily', 'kimberly', 'deborah', 'dorothy', 'julie', 'amy', 'angela', 'anna', 'rebecca',
+    'virginia', 'kathleen', 'pamela', 'martha', 'debra', 'amanda', 'stephanie', 'carolyn', 'christine', 'marie',
+    'janet', 'catherine', 'frances', 'ann', 'joyce', 'diane', 'alice', 'julie', 'heather', 'teresa',
+    'doris', 'gloria', 'evelyn', 'jean', 'cheryl', 'mildred', 'katherine', 'joan', 'ashley', 'kelly'
+})
+
+# Common unisex names
+_UNISEX_NAMES = frozenset({
+    'alex', 'alexis', 'casey', 'drew', 'jordan', 'morgan', 'pat', 'patricia', 'robin', 'sam', 'samuel',
+    'taylor', 'tracy', 'jamie', 'jessie', 'jesse', 'kris', 'chris', 'kelly', 'dana', 'dane', 'lee',
+    'leslie', 'lesley', 'avery', 'riley', 'quinn', 'blake', 'hayden', 'logan', 'parker', 'reese'
+})
+
+# Exact-match vocabulary for vectorized lookups; male names listed last so
+# they take precedence, matching the check order in infer_gender_from_name
+_GENDER_VOCAB = pd.Series({**{n: 'F' for n in _FEMALE_NAMES}, **{n: 'M' for n in _MALE_NAMES}})
+
+
+def _infer_gender_series(names: pd.Series) -> pd.Series:
+    """Vectorized equivalent of infer_gender_from_name for a whole Series.
+
+    Resolves exact name matches with a single map against the vocabulary,
+    then classifies the remainder by suffix regex, so no Python-level call
+    is made per row.
     """
-    if pd.isna(name) or not isinstance(name, str):
-        return "Other"
-    
-    # Clean the name
-    name = name.strip().lower()
-    
-    # Common male names (high confidence)
-    male_names = {
-        'james', 'robert', 'john', 'michael', 'david', 'william', 'richard', 'joseph', 'thomas', 'christopher',
-        'charles', 'daniel', 'matthew', 'anthony', 'mark', 'donald', 'steven', 'paul', 'andrew', 'joshua',
-        'kenneth', 'kevin', 'brian', 'george', 'timothy', 'ronald', 'jason', 'edward', 'jeffrey', 'ryan',
-        'jacob', 'gary', 'nicholas', 'eric', 'jonathan', 'stephen', 'larry', 'justin', 'scott', 'brandon',
-        'benjamin', 'frank', 'gregory', 'raymond', 'samuel', 'patrick', 'alexander', 'jack', 'dennis', 'jerry',
-        'mike', 'joe', 'jim', 'bob', 'tom', 'dave', 'chris', 'steve', 'tony', 'jimmy', 'bobby', 'tommy'
-    }
-    
-    # Common female names (high confidence)
-    female_names = {
-        'mary', 'patricia', 'jennifer', 'linda', 'elizabeth', 'barbara', 'susan', 'jessica', 'sarah', 'karen',
-        'nancy', 'lisa', 'betty', 'helen', 'sandra', 'donna', 'carol', 'ruth', 'sharon', 'michelle',
-        'laura', 'emily', 'kimberly', 'deborah', 'dorothy', 'julie', 'amy', 'angela', 'anna', 'rebecca',
-        'virginia', 'kathleen', 'pamela', 'martha', 'debra', 'amanda', 'stephanie', 'carolyn', 'christine', 'marie',
-        'janet', 'catherine', 'frances', 'ann', 'joyce', 'diane', 'alice', 'julie', 'heather', 'teresa',
-        'doris', 'gloria', 'evelyn', 'jean', 'cheryl', 'mildred', 'katherine', 'joan', 'ashley', 'kelly'
-    }
-    
+    cleaned = names.astype('string').str.strip().str.lower()
+    result = pd.Series(cleaned.map(_GENDER_VOCAB), index=names.index, dtype=object)
+    unresolved = result.isna() & cleaned.notna()
+    if unresolved.any():
+        residual = cleaned[unresolved]
+        fem = residual.str.contains(_FEM_SUFFIX_RE).to_numpy(dtype=bool)
+        male = residual.str.contains(_MALE_SUFFIX_RE).to_numpy(dtype=bool)
+        result.loc[unresolved] = np.where(fem, 'F', np.where(male, 'M', 'Other'))
+    return result.where(result.notna(), 'Other')
+
+@functools.lru_cache(maxsize=8192)
+def _classify_lower(name: str) -> str:
+    """Classify an already-stripped, lowercased name. Cached because real
+    datasets repeat the same first names many times."""
     # Check for exact matches
-    if name in male_names:
+    if name in _MALE_NAMES:
         return "M"
-    elif name in female_names:
+    elif name in _FEMALE_NAMES:
         return "F"
     
     # Check for name endings that are typically gender-specific
-    if name.endswith(('a', 'ia', 'ina', 'ella', 'ette', 'ine', 'ina', 'ana', 'ena')):
+    if _FEM_SUFFIX_RE.search(name):
         return "F"
-    elif name.endswith(('o', 'us', 'er', 'or', 'an', 'en', 'in', 'on')):
+    elif _MALE_SUFFIX_RE.search(name):
         return "M"
     
     # Check for common unisex names
-    unisex_names = {
-        'alex', 'alexis', 'casey', 'drew', 'jordan', 'morgan', 'pat', 'patricia', 'robin', 'sam', 'samuel',
-        'taylor', 'tracy', 'jamie', 'jessie', 'jesse', 'kris', 'chris', 'kelly', 'dana', 'dane', 'lee',
-        'leslie', 'lesley', 'avery', 'riley', 'quinn', 'blake', 'hayden', 'logan', 'parker', 'reese'
-    }
-    
-    if name in unisex_names:
+    if name in _UNISEX_NAMES:
         return "Other"
-    
+
     # If we can't determine, return "Other"
     return "Other"
 
-def intelligent_imputation(df: pd.DataFrame, column: str) -> pd.Series:
+
+def infer_gender_from_name(name: str) -> str:
+    """
+    Infer gender from a first name using common name patterns.
+    Returns 'M', 'F', or 'Other' based on the name.
+    """
+    # Guard before the cached call so NaN and other unhashable-ish
+    # inputs never reach the cache
+    if pd.isna(name) or not isinstance(name, str):
+        return "Other"
+    return _classify_lower(name.strip().lower())
+
+def _maybe_categoricalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast low-cardinality object columns to category dtype in place.
+    Repeated strings compress to integer codes, which shrinks memory and
+    lets mode/value_counts run over the codes instead of Python strings.
+    """
+    if not len(df):
+        return df
+    for col in df.select_dtypes(include='object').columns:
+        nunique = df[col].nunique()
+        if 0 < nunique and nunique / len(df) < 0.5:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def intelligent_imputation(df: pd.DataFrame, column: str, null_mask: pd.Series = None) -> pd.Series:
     """
     Perform intelligent imputation for a specific column, including gender inference from names.
+    Callers that already hold the column's null mask can pass it in to avoid rescanning.
     """
+    if null_mask is None:
+        null_mask = df[column].isna()
     if column.lower() == 'gender':
         # For gender columns, try to infer from first names if available
         name_columns = [col for col in df.columns if any(name_word in col.lower() for name_word in ['first', 'name', 'firstname'])]
@@ -78,22 +132,24 @@ def intelligent_imputation(df: pd.DataFrame, column: str) -> pd.Series:
             name_col = name_columns[0]
             print(f"Using '{name_col}' column to infer missing gender values...")
             
-            # Create a copy to avoid modifying original
-            df_copy = df.copy()
-            
-            # Fill missing gender values using name inference
-            for idx in df_copy.index:
-                if pd.isna(df_copy.at[idx, column]):
-                    name = df_copy.at[idx, name_col]
-                    inferred_gender = infer_gender_from_name(name)
-                    df_copy.at[idx, column] = inferred_gender
-                    print(f"Row {idx}: '{name}' → Gender: {inferred_gender}")
-            
-            return df_copy[column]
+            # Fill missing gender values using name inference, operating
+            # only on the masked rows instead of indexing row by row
+            mask = null_mask
+            inferred = _infer_gender_series(df.loc[mask, name_col])
+            out = df[column].copy()
+            if isinstance(out.dtype, pd.CategoricalDtype):
+                # Inferred labels may not be existing categories
+                out = out.astype(object)
+            out.loc[mask] = inferred
+            if len(inferred):
+                # One summary line instead of a print per imputed row
+                print(f"Imputed {len(inferred)} gender values: {inferred.value_counts().to_dict()}")
+            return out
         else:
             # No name column found, use mode
             print("No name column found for gender inference, using mode imputation...")
-            return df[column].fillna(df[column].mode()[0] if not df[column].mode().empty else "Other")
+            vc = df[column].value_counts(dropna=True)
+            return df[column].fillna(vc.index[0] if len(vc) else "Other")
     
     # For other columns, use standard imputation methods
     if pd.api.types.is_float_dtype(df[column].dtype):
@@ -101,63 +157,103 @@ def intelligent_imputation(df: pd.DataFrame, column: str) -> pd.Series:
     elif pd.api.types.is_integer_dtype(df[column].dtype):
         return df[column].fillna(df[column].median())
     else:
-        return df[column].fillna(df[column].mode()[0] if not df[column].mode().empty else "Unknown")
+        vc = df[column].value_counts(dropna=True)
+        return df[column].fillna(vc.index[0] if len(vc) else "Unknown")
 
-def analyze_missingness(df: pd.DataFrame) -> str:
-    """Generate a markdown report where each row is a column from the dataframe, with headers: Column Name, % Missing, Imputation Method, Data Type, Reason."""
-    percent_missing = df.isnull().mean() * 100
+# Imputation method and rationale by dtype kind code
+_DTYPE_KIND_TO_METHOD = {
+    'f': ('mean', 'Mean is best for continuous numeric data.'),
+    'i': ('median', 'Median is robust for integer data with outliers.'),
+    'u': ('median', 'Median is robust for integer data with outliers.'),
+    'O': ('mode', 'Mode is best for categorical or text data.'),
+}
+_DEFAULT_METHOD = ('mode', 'Mode is safest for unknown or mixed types.')
+
+
+def _column_counts(df: pd.DataFrame) -> np.ndarray:
+    """
+    Non-null counts per column. Very wide frames are counted in column
+    blocks across a thread pool; the count kernels release the GIL, and
+    narrow frames skip the pool to avoid its startup cost.
+    """
+    if df.shape[1] > 256:
+        from concurrent.futures import ThreadPoolExecutor
+        blocks = np.array_split(np.arange(df.shape[1]), os.cpu_count() or 1)
+        with ThreadPoolExecutor() as ex:
+            partials = list(ex.map(lambda idx: df.iloc[:, idx].count(), blocks))
+        return pd.concat(partials).to_numpy()
+    return df.count().to_numpy()
+
+
+def _iter_missingness_rows(columns, dtypes, percent_missing):
+    """Yield the lines of the missingness markdown table from per-column aggregates."""
+    # Single pass over the dtypes using dtype kind codes instead of calling
+    # the pd.api.types predicates for every column
+    kinds = [getattr(dtype, 'kind', 'O') for dtype in dtypes]
     headers = ["Column Name", "% Missing", "Imputation Method", "Data Type", "Reason"]
-    rows = []
-    
-    for col in df.columns:
-        dtype = df[col].dtype
-        missing_pct = percent_missing[col]
-        
+    yield "| " + " | ".join(headers) + " |"
+    yield "|" + "---|" * len(headers)
+
+    for col, dtype, kind, missing_pct in zip(columns, dtypes, kinds, percent_missing):
         # Determine imputation method based on column type and content
-        if col.lower() == 'gender' and missing_pct > 0:
+        if missing_pct == 0:
+            # Fully populated columns need no imputation method at all
+            method = "—"
+            reason = "No missing values."
+        elif col.lower() == 'gender':
             method = "intelligent (name inference)"
             reason = "Gender inferred from first names using pattern matching."
-        elif pd.api.types.is_float_dtype(dtype):
-            method = "mean"
-            reason = "Mean is best for continuous numeric data."
-        elif pd.api.types.is_integer_dtype(dtype):
-            method = "median"
-            reason = "Median is robust for integer data with outliers."
-        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_categorical_dtype(dtype):
-            method = "mode"
-            reason = "Mode is best for categorical or text data."
         else:
-            method = "mode"
-            reason = "Mode is safest for unknown or mixed types."
-        
-        rows.append([
-            col,
-            f"{missing_pct:.2f}%",
-            method,
-            str(dtype),
-            reason
-        ])
-    
-    # Markdown table
-    md = "| " + " | ".join(headers) + " |\n"
-    md += "|" + "---|" * len(headers) + "\n"
-    for row in rows:
-        md += "| " + " | ".join(row) + " |\n"
-    
-    return md
+            method, reason = _DTYPE_KIND_TO_METHOD.get(kind, _DEFAULT_METHOD)
+
+        yield f"| {col} | {missing_pct:.2f}% | {method} | {dtype} | {reason} |"
+
+
+def _format_missingness_table(columns, dtypes, percent_missing) -> str:
+    """Format the missingness markdown table from per-column aggregates."""
+    return "\n".join(_iter_missingness_rows(columns, dtypes, percent_missing)) + "\n"
+
+
+def analyze_missingness(df: pd.DataFrame) -> str:
+    """Generate a markdown report where each row is a column from the dataframe, with headers: Column Name, % Missing, Imputation Method, Data Type, Reason."""
+    # df.count() walks each column's existing null mask; isnull().mean()
+    # would materialize a full boolean frame just to average it
+    n = len(df)
+    if n:
+        percent_missing = (1.0 - _column_counts(df) / n) * 100.0
+    else:
+        percent_missing = np.zeros(len(df.columns))
+    return _format_missingness_table(df.columns, df.dtypes, percent_missing)
 
 def impute_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     Impute missing values in the DataFrame using intelligent methods.
     """
-    df_imputed = df.copy()
-    
+    # Shallow copy: categoricalization and the output frame reference the
+    # original column data instead of duplicating the whole frame
+    original_dtypes = df.dtypes
+    df = _maybe_categoricalize(df.copy(deep=False))
+
+    out_cols = {}
     for col in df.columns:
-        if df[col].isnull().any():
+        # One null mask per column, shared with intelligent_imputation
+        # instead of each step rescanning the column
+        null_mask = df[col].isna()
+        if null_mask.any():
             print(f"Imputing missing values in column: {col}")
-            df_imputed[col] = intelligent_imputation(df, col)
-    
-    return df_imputed
+            out_cols[col] = intelligent_imputation(df, col, null_mask=null_mask)
+        else:
+            out_cols[col] = df[col]
+
+    out = pd.DataFrame(out_cols, index=df.index, copy=False)
+    # The category cast is an internal speedup only; hand the columns back
+    # in the dtypes they came in with so downstream object-dtype checks
+    # (like the PII value scans) still match
+    for col in out.columns:
+        want = original_dtypes[col]
+        if out[col].dtype != want and isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(want)
+    return out
 
 
 def main():
@@ -166,14 +262,34 @@ def main():
     parser.add_argument("data", help="CSV file path")
     parser.add_argument("--output", default="missingness_report.md", help="Output markdown file path")
     args = parser.parse_args()
-    if os.path.exists(args.data):
-        df = pd.read_csv(args.data)
-    else:
+    data_path = pathlib.Path(args.data)
+    out_path = pathlib.Path(args.output)
+    # Stream the CSV in chunks and accumulate per-column null counts so
+    # peak memory is bounded by the chunk size, not the file size
+    null_counts = None
+    dtypes = None
+    columns = None
+    total = 0
+    try:
+        for chunk in pd.read_csv(data_path, chunksize=200_000):
+            counts = chunk.isnull().sum()
+            if null_counts is None:
+                columns = chunk.columns
+                dtypes = chunk.dtypes
+                null_counts = counts
+            else:
+                null_counts = null_counts + counts
+            total += len(chunk)
+    except FileNotFoundError:
         print(f"File not found: {args.data}")
         sys.exit(1)
-    md = analyze_missingness(df)
-    with open(args.output, "w") as f:
-        f.write(md)
+    with out_path.open("w") as f:
+        if null_counts is None or total == 0:
+            f.write(analyze_missingness(pd.read_csv(data_path)))
+        else:
+            percent_missing = (null_counts.to_numpy() / total) * 100.0
+            # Stream rows to the file instead of building the whole report string
+            f.writelines(line + "\n" for line in _iter_missingness_rows(columns, dtypes, percent_missing))
     print(f"Missingness report written to {args.output}")
 
 if __name__ == "__main__":
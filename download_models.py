@@ -8,6 +8,7 @@ so it's included in the Docker image without downloading during build.
 import os
 import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def download_model(model_name):
@@ -59,12 +60,13 @@ def main():
         "mistral-7b-openorca.gguf2.Q4_0.gguf"
     ]
     
-    success_count = 0
-    for model in models:
-        if download_model(model):
-            success_count += 1
-        print()  # Add spacing between models
-    
+    # Download the models concurrently so the transfers overlap instead
+    # of running back to back
+    with ThreadPoolExecutor(max_workers=len(models)) as ex:
+        results = list(ex.map(download_model, models))
+    success_count = sum(results)
+    print()  # Add spacing after download output
+
     print(f"📊 Download Summary:")
     print(f"   ✅ Successfully downloaded: {success_count}/{len(models)} models")
     
@@ -3,40 +3,139 @@
 Simple script to download GPT4All models to local models directory.
 """
 
+import hashlib
+import mmap
 import os
-import subprocess
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# One shared Session: both models come from the same host, so reusing the
+# connection pool amortizes the DNS lookup and TLS handshake across
+# downloads. pool_maxsize covers both models downloading segmented at once.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Known-good SHA256 digests; fill in as model versions are pinned.
+# Models without an entry skip verification.
+_EXPECTED_SHA256 = {}
+
+def _verify(model_file, model_name):
+    """Check the file's SHA256 against the pinned digest, if one is known.
+
+    mmap lets hashlib walk the file at memory bandwidth without pulling
+    4 GB into the heap; a size-only check can't catch a partial or
+    corrupted transfer.
+    """
+    expected = _EXPECTED_SHA256.get(model_name)
+    if expected is None:
+        return True
+    with open(model_file, 'rb') as f, mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+        digest = hashlib.sha256(memoryview(mm)).hexdigest()
+    if digest != expected:
+        print(f"❌ Checksum mismatch for {model_name}")
+        return False
+    return True
+
+def _drop_page_cache(fd):
+    """Flush the file and tell the kernel its pages won't be re-read.
+
+    O_DIRECT would bypass the page cache entirely, but it imposes block
+    alignment on every write and is rejected by overlayfs inside Docker;
+    fadvise(DONTNEED) after a flush frees the same 4 GB of cache safely.
+    """
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except (AttributeError, OSError):
+        pass
+
+def _segmented_download(url, path, n=6):
+    """Fetch a file as n parallel byte-range requests. Returns True on success."""
+    head = _SESSION.head(url, timeout=30, allow_redirects=True)
+    head.raise_for_status()
+    total = int(head.headers.get("Content-Length", 0))
+    # Also skip files too small to split; n slices of a sub-n-byte file
+    # would produce inverted ranges
+    if total < n or head.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return False
+
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    try:
+        # Pre-size the file so each worker can pwrite its slice in place;
+        # the call is Linux-only, elsewhere the pwrites extend the file
+        try:
+            os.posix_fallocate(fd, 0, total)
+        except (AttributeError, OSError):
+            pass
+
+        bounds = [(i * total // n, (i + 1) * total // n - 1) for i in range(n)]
+
+        def _fetch_range(bound):
+            lo, hi = bound
+            offset = lo
+            with _SESSION.get(url, headers={"Range": f"bytes={lo}-{hi}"}, stream=True, timeout=30) as r:
+                r.raise_for_status()
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+            return offset - lo
+
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            written = sum(ex.map(_fetch_range, bounds))
+        _drop_page_cache(fd)
+        return written == total
+    finally:
+        os.close(fd)
+
 def download_model(model_name, url):
-    """Download a model using wget."""
+    """Download a model by streaming it straight to disk."""
     models_dir = Path("models")
     models_dir.mkdir(exist_ok=True)
-    
+
     model_file = models_dir / model_name
-    
+
     if model_file.exists():
-        size_mb = model_file.stat().st_size / (1024 * 1024)
-        print(f"✅ Model already exists: {model_name} ({size_mb:.1f} MB)")
-        return True
-    
-    print(f"Downloading {model_name}...")
-    try:
-        # Use wget to download the model
-        result = subprocess.run([
-            "wget", "-O", str(model_file), url
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
+        if _verify(model_file, model_name):
             size_mb = model_file.stat().st_size / (1024 * 1024)
-            print(f"✅ Successfully downloaded {model_name} ({size_mb:.1f} MB)")
+            print(f"✅ Model already exists: {model_name} ({size_mb:.1f} MB)")
             return True
-        else:
-            print(f"❌ Failed to download {model_name}: {result.stderr}")
+        model_file.unlink()  # Corrupt cached file; re-download
+
+    print(f"Downloading {model_name}...")
+    try:
+        # CDNs often throttle per connection, so try a segmented fetch
+        # first; anything that keeps it from finishing (no range support,
+        # a rejected HEAD, a dropped connection) falls back to one
+        # streamed GET rather than failing the download
+        try:
+            segmented = _segmented_download(url, model_file)
+        except Exception:
+            segmented = False
+        if not segmented:
+            with _SESSION.get(url, stream=True, timeout=30) as r:
+                r.raise_for_status()
+                with open(model_file, "wb") as f:
+                    shutil.copyfileobj(r.raw, f, length=1 << 20)
+                    f.flush()
+                    _drop_page_cache(f.fileno())
+
+        if not _verify(model_file, model_name):
+            model_file.unlink()
             return False
-            
-    except FileNotFoundError:
-        print("❌ wget not found. Please install wget or use curl.")
+
+        size_mb = model_file.stat().st_size / (1024 * 1024)
+        print(f"✅ Successfully downloaded {model_name} ({size_mb:.1f} MB)")
+        return True
+
+    except Exception as e:
+        print(f"❌ Failed to download {model_name}: {e}")
+        if model_file.exists():
+            model_file.unlink()  # Remove partial file
         return False
 
 def main():
@@ -49,11 +148,15 @@ def main():
         "mistral-7b-openorca.gguf2.Q4_0.gguf": "https://gpt4all.io/models/gguf/mistral-7b-openorca.gguf2.Q4_0.gguf"
     }
     
+    # Download both models concurrently; the work is I/O-bound on socket
+    # reads, so wall time drops to the slowest transfer instead of the sum
     success_count = 0
-    for model_name, url in models.items():
-        if download_model(model_name, url):
-            success_count += 1
-        print()
+    with ThreadPoolExecutor(max_workers=len(models)) as ex:
+        futures = {ex.submit(download_model, name, url): name for name, url in models.items()}
+        for future in as_completed(futures):
+            if future.result():
+                success_count += 1
+            print()
     
     print(f"📊 Download Summary:")
     print(f"   ✅ Successfully downloaded: {success_count}/{len(models)} models")
@@ -3,59 +3,96 @@
 Script to enable GPU support in genai.py
 """
 
-import re
+import ast
+import hashlib
+import os
+import shutil
+
+GENAI_PATH = 'code/genai.py'
+
+# Content-addressed cache of transformed outputs, keyed by input hash
+_CACHE_DIR = os.path.join('.cache', 'enable-gpu')
+
+_TARGET_FUNCTIONS = {"describe_dataset_with_genai", "analyze_bias_with_genai", "PII_assessment"}
+
+_GPU_CHECK = '''
+# Check for GPU availability
+try:
+    import torch
+    gpu_available = torch.cuda.is_available()
+    device = "gpu" if gpu_available else "cpu"
+except ImportError:
+    device = "cpu"
+'''
+
+class _GPUEnabler(ast.NodeTransformer):
+    """Add the GPU availability check to target functions and pass device to GPT4All."""
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if name == "GPT4All" and not any(kw.arg == "device" for kw in node.keywords):
+            node.keywords.append(ast.keyword(arg="device", value=ast.Constant("gpu")))
+        return node
+
+    @staticmethod
+    def _has_gpu_check(node):
+        return any(
+            isinstance(stmt, ast.Try) and any(
+                isinstance(s, ast.Import) and any(a.name == 'torch' for a in s.names)
+                for s in stmt.body)
+            for stmt in node.body)
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        if node.name in _TARGET_FUNCTIONS and not self._has_gpu_check(node):
+            # Insert the check right after the docstring, if there is one
+            pos = 0
+            if (node.body and isinstance(node.body[0], ast.Expr)
+                    and isinstance(node.body[0].value, ast.Constant)
+                    and isinstance(node.body[0].value.value, str)):
+                pos = 1
+            node.body[pos:pos] = ast.parse(_GPU_CHECK).body
+        return node
 
 def enable_gpu_in_genai():
     """Modify genai.py to use GPU acceleration"""
-    
+
     # Read the current genai.py file
-    with open('code/genai.py', 'r') as f:
-        content = f.read()
-    
-    # Add GPU device parameter to GPT4All initialization
-    # Find the model initialization lines and add device='gpu'
-    content = re.sub(
-        r'model = GPT4All\(([^)]+)\)',
-        r'model = GPT4All(\1, device="gpu")',
-        content
-    )
-    
-    # Add GPU availability check at the top of functions
-    gpu_check = '''
-    # Check for GPU availability
+    with open(GENAI_PATH, 'rb') as f:
+        raw = f.read()
+
+    # Re-runs (Docker RUN sequences, test loops) hit a content-addressed
+    # cache: if this exact input was transformed before, link the stored
+    # output into place instead of parsing and unparsing again
+    key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    cached = os.path.join(_CACHE_DIR, f'{key}.py')
+    if os.path.exists(cached):
+        os.unlink(GENAI_PATH)
+        try:
+            os.link(cached, GENAI_PATH)
+        except OSError:
+            shutil.copy(cached, GENAI_PATH)
+        print("GPU support enabled in genai.py (cached)")
+        return
+
+    # One AST pass replaces the four whole-file regex scans, and handles
+    # multiline GPT4All(...) calls the old ([^)]+) pattern mangled
+    tree = _GPUEnabler().visit(ast.parse(raw))
+    ast.fix_missing_locations(tree)
+
+    # Write the modified source back and store it for next time; unlink
+    # first so a previous cache hard link is never truncated through
+    os.unlink(GENAI_PATH)
+    with open(GENAI_PATH, 'w') as f:
+        f.write(ast.unparse(tree) + "\n")
+    os.makedirs(_CACHE_DIR, exist_ok=True)
     try:
-        import torch
-        gpu_available = torch.cuda.is_available()
-        device = "gpu" if gpu_available else "cpu"
-    except ImportError:
-        device = "cpu"
-'''
-    
-    # Add GPU check to describe_dataset_with_genai function
-    content = re.sub(
-        r'(def describe_dataset_with_genai\([^)]+\):\s*\n\s*"""[^"]*"""\s*\n)',
-        r'\1' + gpu_check + '\n',
-        content
-    )
-    
-    # Add GPU check to analyze_bias_with_genai function
-    content = re.sub(
-        r'(def analyze_bias_with_genai\([^)]+\):\s*\n\s*"""[^"]*"""\s*\n)',
-        r'\1' + gpu_check + '\n',
-        content
-    )
-    
-    # Add GPU check to PII_assessment function
-    content = re.sub(
-        r'(def PII_assessment\([^)]+\):\s*\n\s*"""[^"]*"""\s*\n)',
-        r'\1' + gpu_check + '\n',
-        content
-    )
-    
-    # Write the modified content back
-    with open('code/genai.py', 'w') as f:
-        f.write(content)
-    
+        os.link(GENAI_PATH, cached)
+    except OSError:
+        shutil.copy(GENAI_PATH, cached)
+
     print("GPU support enabled in genai.py")
     print("Models will now use GPU acceleration when available")
 
@@ -3,20 +3,61 @@
 Script to switch Truify from local GPT4All to OpenRouter.ai
 """
 
+import fileinput
 import os
 import shutil
+import sys
+
+def _snapshot(src, dst):
+    """Back up src to dst as a hard link when the filesystem allows.
+
+    Linking is an O(1) metadata operation instead of an O(size) read and
+    write; the backup inode keeps the original bytes as long as src is
+    later unlinked and recreated, never truncated in place.
+    """
+    try:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+def _copy_contents(src, dst):
+    """Copy src to dst in-kernel via copy_file_range, without bouncing the
+    bytes through a userspace buffer. Falls back to a buffered copy where
+    the syscall is unavailable or the filesystem rejects it."""
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        size = os.fstat(s.fileno()).st_size
+        try:
+            copied = 0
+            while copied < size:
+                n = os.copy_file_range(s.fileno(), d.fileno(), size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except (AttributeError, OSError):
+            s.seek(0)
+            d.seek(0)
+            d.truncate()
+            shutil.copyfileobj(s, d)
 
 def switch_to_openrouter():
     """Switch from local GPT4All to OpenRouter.ai implementation"""
-    
+
     # Backup original genai.py
     if os.path.exists('code/genai.py'):
-        shutil.copy('code/genai.py', 'code/genai_gpt4all_backup.py')
+        _snapshot('code/genai.py', 'code/genai_gpt4all_backup.py')
         print("✓ Backed up original genai.py to genai_gpt4all_backup.py")
-    
+
     # Copy OpenRouter implementation
     if os.path.exists('code/genai_openrouter.py'):
-        shutil.copy('code/genai_openrouter.py', 'code/genai.py')
+        # Unlink instead of overwriting in place so the hard-linked
+        # backup keeps pointing at the original content
+        try:
+            os.unlink('code/genai.py')
+        except FileNotFoundError:
+            pass
+        _copy_contents('code/genai_openrouter.py', 'code/genai.py')
         print("✓ Switched to OpenRouter implementation")
     else:
         print("✗ OpenRouter implementation not found")
@@ -24,16 +65,13 @@ def switch_to_openrouter():
     
     # Update requirements.txt to remove gpt4all
     if os.path.exists('requirements.txt'):
-        with open('requirements.txt', 'r') as f:
-            content = f.read()
-        
-        # Remove gpt4all line
-        lines = content.split('\n')
-        lines = [line for line in lines if 'gpt4all' not in line]
-        
-        with open('requirements.txt', 'w') as f:
-            f.write('\n'.join(lines))
-        
+        # Filter in one streaming pass; fileinput rewrites the file in
+        # place without materializing it or a list of lines in memory
+        with fileinput.input('requirements.txt', inplace=True) as f:
+            for line in f:
+                if 'gpt4all' not in line:
+                    sys.stdout.write(line)
+
         print("✓ Removed gpt4all from requirements.txt")
     
     print("\n🎉 Successfully switched to OpenRouter.ai!")
@@ -49,7 +87,12 @@ def switch_back_to_gpt4all():
     
     # Restore original genai.py
     if os.path.exists('code/genai_gpt4all_backup.py'):
-        shutil.copy('code/genai_gpt4all_backup.py', 'code/genai.py')
+        # Unlink first in case genai.py still shares an inode with the backup
+        try:
+            os.unlink('code/genai.py')
+        except FileNotFoundError:
+            pass
+        _copy_contents('code/genai_gpt4all_backup.py', 'code/genai.py')
         print("✓ Restored original GPT4All implementation")
     else:
         print("✗ GPT4All backup not found")
@@ -57,16 +100,14 @@ def switch_back_to_gpt4all():
     
     # Restore gpt4all to requirements.txt
     if os.path.exists('requirements.txt'):
+        # Short-circuit on the first match instead of reading the file whole
         with open('requirements.txt', 'r') as f:
-            content = f.read()
-        
-        if 'gpt4all' not in content:
-            lines = content.split('\n')
-            lines.append('gpt4all')
-            
-            with open('requirements.txt', 'w') as f:
-                f.write('\n'.join(lines))
-            
+            present = any('gpt4all' in line for line in f)
+
+        if not present:
+            with open('requirements.txt', 'a') as f:
+                f.write('gpt4all\n')
+
             print("✓ Restored gpt4all to requirements.txt")
     
     print("\n🎉 Successfully switched back to GPT4All!")
@@ -77,8 +118,6 @@ def switch_back_to_gpt4all():
     return True
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "gpt4all":
         switch_back_to_gpt4all()
     else: